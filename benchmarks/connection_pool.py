@@ -0,0 +1,115 @@
+"""Connections opened by many clients with a session each against the shared connection pool
+
+A local keep-alive http server counts the accepted connections (the handshakes) and the max sockets open at
+the same time, while the clients send some requests each from several threads.
+
+Usage: python -m benchmarks.connection_pool [clients] [requests per client] [threads]
+"""
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from factorial.factorialclient import FactorialClient
+from factorial.pool import ConnectionPool
+from factorial.ratelimit import RateLimiter
+
+DEFAULT_CLIENTS = 200
+DEFAULT_REQUESTS = 3
+DEFAULT_THREADS = 16
+
+
+class CountingServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), CountingHandler)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.connections = 0
+            self.open_sockets = 0
+            self.max_open_sockets = 0
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+            self.server.open_sockets += 1
+            self.server.max_open_sockets = max(self.server.max_open_sockets, self.server.open_sockets)
+
+    def finish(self):
+        super().finish()
+        with self.server.lock:
+            self.server.open_sockets -= 1
+
+    def do_GET(self):
+        body = b'[]'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(server, url, clients, requests_per_client, threads, shared):
+    """Send the requests of all the clients
+
+    :return: tuple(connections, max open sockets, seconds)
+    """
+    server.reset()
+    pool = ConnectionPool(max_connections=threads) if shared else None
+    rate_limiter = RateLimiter(limits={RateLimiter.READ: (1e6, 1e6)})
+    journal_folder = tempfile.mkdtemp()
+    factorial_clients = []
+    for number in range(clients):
+        client = FactorialClient(f'benchmark{number}@example.com', '', journal_folder=journal_folder,
+                                 rate_limiter=rate_limiter, connection_pool=pool)
+        if not shared:
+            # Previous behaviour, a session with its own connections for each client
+            client.session = requests.Session()
+        factorial_clients.append(client)
+
+    def work(client):
+        for _ in range(requests_per_client):
+            client.request('get', url, RateLimiter.READ).content
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(work, factorial_clients))
+    elapsed = time.perf_counter() - start
+    result = server.connections, server.max_open_sockets, elapsed
+
+    for client in factorial_clients:
+        client.session.close()
+    if pool:
+        pool.close()
+    return result
+
+
+if __name__ == '__main__':
+    arguments = [int(argument) for argument in sys.argv[1:]]
+    defaults = [DEFAULT_CLIENTS, DEFAULT_REQUESTS, DEFAULT_THREADS]
+    clients, requests_per_client, threads = arguments + defaults[len(arguments):]
+    server = CountingServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_port}/'
+    print(f'{clients} clients x {requests_per_client} requests, {threads} threads')
+    print(f'{"sessions":>10} {"handshakes":>11} {"max open sockets":>17} {"seconds":>8}')
+    for name, shared in (('per client', False), ('shared', True)):
+        connections, max_open_sockets, elapsed = run(server, url, clients, requests_per_client, threads, shared)
+        print(f'{name:>10} {connections:>11} {max_open_sockets:>17} {elapsed:>8.2f}')
+    server.shutdown()
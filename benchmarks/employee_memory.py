@@ -0,0 +1,135 @@
+"""Memory used to load the accesses and employees of a company
+
+Compares the previous full dictionaries decoded with response.json() against the compact Employee records,
+decoded while the response is downloaded with the stdlib codec or at once with orjson when it's installed.
+
+Usage: python -m benchmarks.employee_memory [sizes...]
+"""
+import gc
+import io
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import requests
+
+from factorial.codec import JsonCodec, get_codec, orjson
+from factorial.factorialclient import FactorialClient
+from factorial.roster import RosterCache
+from factorial.transport import Transport
+
+DEFAULT_SIZES = (10000, 50000)
+
+
+def generate_payloads(size):
+    """Accesses and employees json of a company, with the ~30 fields that the api returns
+
+    :param size: int, number of employees
+    :return: tuple(accesses bytes, employees bytes)
+    """
+    accesses = [
+        {
+            'id': access_id, 'user_id': access_id + 100000, 'company_id': 1, 'invited': True,
+            'invited_on': '2020-01-01', 'role': 'basic', 'current': access_id == 1, 'calendar_token': None,
+            'first_name': f'Name{access_id}', 'last_name': f'Surname{access_id}',
+            'email': f'employee{access_id}@example.com', 'unconfirmed_email': None, 'joined': True,
+            'locale': 'es', 'avatar': None, 'tos': True
+        }
+        for access_id in range(1, size + 1)
+    ]
+    employees = [
+        {
+            'access_id': access_id, 'birthday_on': '1990-01-01', 'hired_on': '2020-01-01',
+            'job_title': 'Developer', 'id': access_id + 500000, 'manager_id': 1, 'supervised_by_current': False,
+            'terminated_on': None, 'is_terminating': False, 'timeoff_policy_id': 1, 'timeoff_manager_id': 1,
+            'timeoff_supervised_by_current': False, 'location_id': 1, 'employee_group_id': None,
+            'payroll_hiring_id': None, 'is_eligible_for_payroll': False
+        }
+        for access_id in range(1, size + 1)
+    ]
+    return json.dumps(accesses).encode('utf-8'), json.dumps(employees).encode('utf-8')
+
+
+class PayloadTransport(Transport):
+
+    def __init__(self, accesses, employees):
+        self.payloads = {
+            FactorialClient.USER_INFO_URL: accesses,
+            FactorialClient.EMPLOYEE_URL: employees
+        }
+
+    def send(self, session, method, url, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.raw = io.BytesIO(self.payloads[url])
+        return response
+
+
+def load_dictionaries(transport):
+    """Previous loading: the whole responses decoded and merged on dictionaries"""
+    session = requests.Session()
+    current_user = {}
+    mates = []
+    for user in transport.send(session, 'get', FactorialClient.USER_INFO_URL).json():
+        if user.get('current', False):
+            current_user = user
+        else:
+            mates.append(user)
+    users = {mate.get('id'): mate for mate in mates}
+    users[current_user.get('id')] = current_user
+    for employee in transport.send(session, 'get', FactorialClient.EMPLOYEE_URL).json():
+        user = users.get(employee.get('access_id'))
+        if user is not None:
+            user.update(employee)
+    return current_user, mates
+
+
+def compact_loader(codec):
+    """Current loading: Employee records decoded with the codec
+
+    :param codec: JsonCodec
+    :return: function(transport)
+    """
+    def load_compact(transport):
+        client = FactorialClient('benchmark@example.com', '', transport=transport, codec=codec,
+                                 journal_folder=tempfile.mkdtemp(), roster_cache=RosterCache(ttl=0))
+        client.load_user_data()
+        return client.current_user, client.mates
+    return load_compact
+
+
+def loaders():
+    """Loaders to compare, name: function(transport)"""
+    installed = {'dictionaries': load_dictionaries, 'compact json': compact_loader(JsonCodec())}
+    if orjson is not None:
+        installed['compact orjson'] = compact_loader(get_codec('orjson'))
+    return installed
+
+
+def measure(load, transport):
+    """Measure the memory of a load
+
+    :return: tuple(peak MiB, retained MiB, seconds)
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = load(transport)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak / 2 ** 20, retained / 2 ** 20, elapsed
+
+
+if __name__ == '__main__':
+    sizes = [int(size) for size in sys.argv[1:]] or DEFAULT_SIZES
+    print(f'{"employees":>10} {"loader":>14} {"peak MiB":>10} {"retained MiB":>13} {"seconds":>8}')
+    for size in sizes:
+        transport = PayloadTransport(*generate_payloads(size))
+        for name, load in loaders().items():
+            peak, retained, elapsed = measure(load, transport)
+            print(f'{size:>10} {name:>14} {peak:>10.1f} {retained:>13.1f} {elapsed:>8.2f}')
@@ -0,0 +1,95 @@
+"""Time to decode the json of the api responses with each installed codec, plain and compressed
+
+The employees are decoded as the client does with FactorialClient.stream_json_array, the other payloads as
+FactorialClient.decode_json.
+
+Usage: python -m benchmarks.json_codec [repetitions]
+"""
+import gzip
+import json
+import sys
+import time
+import zlib
+
+from benchmarks.employee_memory import generate_payloads
+from factorial.codec import JsonCodec, decompress, decompress_chunks, get_codec, orjson
+from factorial.jsonstream import CHUNK_SIZE
+
+DEFAULT_REPETITIONS = 20
+
+
+def generate_periods(months):
+    """Periods of the company for some months, with the distribution of each day"""
+    return json.dumps([
+        {
+            'id': month, 'employee_id': 1, 'year': 2021, 'month': month % 12 + 1, 'state': 'pending',
+            'estimated_minutes': 9600, 'worked_minutes': 9450,
+            'distribution': [450 if day % 7 < 5 else 0 for day in range(31)],
+            'estimated_hours_in_cents': 16000, 'worked_hours_in_cents': 15750,
+            'distribution_in_cents': [750 if day % 7 < 5 else 0 for day in range(31)]
+        }
+        for month in range(months)
+    ]).encode('utf-8')
+
+
+def generate_shifts(employees, days=22):
+    """Shifts of a month for some employees, two for each day"""
+    return json.dumps([
+        {
+            'id': employee * 100 + day * 2 + half, 'period_id': employee, 'day': day + 1,
+            'clock_in': '7:30' if half == 0 else '10:30', 'clock_out': '10:00' if half == 0 else '15:30',
+            'minutes': 150 if half == 0 else 300, 'observations': None, 'history': [], 'half_day': None,
+            'workable': True, 'automatic_clock_in': False, 'automatic_clock_out': False
+        }
+        for employee in range(employees) for day in range(days) for half in range(2)
+    ]).encode('utf-8')
+
+
+def decode_body(codec, body):
+    """Decode a whole response as FactorialClient.decode_json"""
+    return codec.loads(decompress(body))
+
+
+def decode_stream(codec, body):
+    """Decode a streamed array as FactorialClient.stream_json_array"""
+    chunks = (body[start:start + CHUNK_SIZE] for start in range(0, len(body), CHUNK_SIZE))
+    return list(codec.iter_array(decompress_chunks(chunks)))
+
+
+def payloads():
+    """Realistic payloads, name: tuple(bytes, function(codec, body) to decode it)"""
+    accesses, employees = generate_payloads(10000)
+    return {
+        'periods 12 months': (generate_periods(12), decode_body),
+        'shifts 1 employee': (generate_shifts(1), decode_body),
+        'shifts 500 employees': (generate_shifts(500), decode_body),
+        'employees 10k': (employees, decode_stream),
+    }
+
+
+def codecs():
+    """Codecs installed"""
+    installed = [JsonCodec()]
+    if orjson is not None:
+        installed.append(get_codec('orjson'))
+    return installed
+
+
+def measure(codec, decode, body, repetitions):
+    """Seconds to decode the body, best of the repetitions"""
+    best = float('inf')
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        decode(codec, body)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == '__main__':
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_REPETITIONS
+    print(f'{"payload":>22} {"KiB":>8} {"encoding":>9} {"codec":>7} {"ms":>8}')
+    for name, (body, decode) in payloads().items():
+        for encoding, encoded in (('plain', body), ('gzip', gzip.compress(body)), ('deflate', zlib.compress(body))):
+            for codec in codecs():
+                elapsed = measure(codec, decode, encoded, repetitions)
+                print(f'{name:>22} {len(encoded) / 1024:>8.1f} {encoding:>9} {codec.name:>7} {elapsed * 1000:>8.2f}')
@@ -0,0 +1,153 @@
+import json
+import zlib
+
+from factorial.jsonstream import iter_json_array
+
+try:
+    import orjson
+except ImportError:
+    # Optional accelerated backend, without it the standard library is used
+    orjson = None
+
+# First bytes of a gzip body
+GZIP_MAGIC = b'\x1f\x8b'
+# Window bits to decompress gzip or zlib (deflate) bodies detecting the header
+AUTO_HEADER_WBITS = zlib.MAX_WBITS | 32
+
+
+class JsonCodec:
+    name = 'json'
+
+    def loads(self, data):
+        """Decode json
+
+        :param data: bytes or string
+        :return: decoded object
+        """
+        return json.loads(data)
+
+    def dumps(self, obj):
+        """Encode json, without spaces
+
+        :param obj: object to encode
+        :return: string
+        """
+        return json.dumps(obj, separators=(',', ':'))
+
+    def iter_array(self, chunks):
+        """Decode a json array while it's downloaded, keeping only the current item in memory
+
+        :param chunks: iterable of bytes
+        :return: generator of the items of the array
+        """
+        return iter_json_array(chunks)
+
+
+class OrjsonCodec(JsonCodec):
+    name = 'orjson'
+
+    def loads(self, data):
+        """Decode json
+
+        :param data: bytes or string
+        :return: decoded object
+        """
+        return orjson.loads(data)
+
+    def dumps(self, obj):
+        """Encode json, without spaces
+
+        :param obj: object to encode
+        :return: string
+        """
+        return orjson.dumps(obj).decode('utf-8')
+
+    def iter_array(self, chunks):
+        """Decode a json array with a single call, much faster than decoding it while it's downloaded but
+        the whole body and array are in memory until the items are consumed
+
+        :param chunks: iterable of bytes
+        :return: generator of the items of the array
+        """
+        items = self.loads(b''.join(chunks))
+        if not isinstance(items, list):
+            raise ValueError('Expected a json array')
+        for position, item in enumerate(items):
+            # Release each item once it's consumed
+            items[position] = None
+            yield item
+
+
+def get_codec(name=None):
+    """Get a json codec
+
+    :param name: (optional) string, 'json' or 'orjson', by default the fastest installed
+    :return: JsonCodec
+    """
+    if name is None:
+        name = OrjsonCodec.name if orjson is not None else JsonCodec.name
+    if name == OrjsonCodec.name:
+        if orjson is None:
+            raise ImportError('orjson is not installed')
+        return OrjsonCodec()
+    if name == JsonCodec.name:
+        return JsonCodec()
+    raise ValueError(f'Unknown json codec {name}')
+
+
+def is_compressed(data):
+    """Check if a json body is compressed with gzip or deflate, a json can't start with those bytes
+
+    :param data: bytes
+    :return: bool
+    """
+    if data[:2] == GZIP_MAGIC:
+        return True
+    # Deflate with zlib header, the header is a multiple of 31
+    return len(data) >= 2 and data[0] & 0x0f == 8 and (data[0] << 8 | data[1]) % 31 == 0
+
+
+def decompress(data):
+    """Decompress a gzip or deflate body, a body not compressed is returned as it is
+
+    :param data: bytes
+    :return: bytes
+    """
+    if not is_compressed(data):
+        return data
+    try:
+        return zlib.decompress(data, AUTO_HEADER_WBITS)
+    except zlib.error:
+        # A json number that looks like a deflate header
+        return data
+
+
+def decompress_chunks(chunks):
+    """Decompress a gzip or deflate body while it's downloaded, a body not compressed is returned as it is
+
+    :param chunks: iterable of bytes
+    :return: generator of bytes
+    """
+    chunks = iter(chunks)
+    # The first bytes are needed to detect the compression, a chunk can have a single byte
+    head = b''
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= 2:
+            break
+    if not is_compressed(head):
+        if head:
+            yield head
+        yield from chunks
+        return
+
+    decompressor = zlib.decompressobj(AUTO_HEADER_WBITS)
+    yield decompressor.decompress(head)
+    for chunk in chunks:
+        if chunk:
+            yield decompressor.decompress(chunk)
+    yield decompressor.flush()
+
+
+# Codec used when no other is given
+DEFAULT_CODEC = get_codec()
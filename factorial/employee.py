@@ -0,0 +1,88 @@
+class Employee:
+    # Fields of the access (/accesses) used by the client
+    ACCESS_FIELDS = ('user_id', 'company_id', 'email', 'first_name', 'last_name', 'current')
+
+    __slots__ = ('id', 'access_id') + ACCESS_FIELDS + ('extra',)
+
+    def __init__(self, access, extra_fields=()):
+        """Compact employee, only with the fields used by the client
+
+        Until the employee info is loaded the id is the access id, after loading it (see update_employee)
+        the id is the employee id, the same as merging the access and employee dictionaries.
+        :param access: dict, access info from /accesses
+        :param extra_fields: (optional) iterable of string, other fields to keep from the access and employee
+        """
+        self.id = access.get('id')
+        self.access_id = self.id
+        for field in self.ACCESS_FIELDS:
+            setattr(self, field, access.get(field))
+        self.extra = None
+        self.update_extra(access, extra_fields)
+
+    def update_employee(self, employee, extra_fields=()):
+        """Load the employee info from /employees
+
+        :param employee: dict, employee info with the access_id of this employee
+        :param extra_fields: (optional) iterable of string, other fields to keep
+        """
+        self.id = employee.get('id')
+        self.update_extra(employee, extra_fields)
+
+    def update_extra(self, info, extra_fields):
+        """Keep the extra fields that are on the info
+
+        :param info: dict
+        :param extra_fields: iterable of string
+        """
+        for field in extra_fields:
+            if field in info:
+                if self.extra is None:
+                    self.extra = {}
+                self.extra[field] = info[field]
+
+    def copy(self, **fields):
+        """Copy of the employee
+
+        :param fields: fields to change on the copy, eg: current=True
+        :return: Employee
+        """
+        employee = Employee.__new__(Employee)
+        for field in self.__slots__:
+            setattr(employee, field, getattr(self, field))
+        if self.extra is not None:
+            employee.extra = dict(self.extra)
+        for field, value in fields.items():
+            setattr(employee, field, value)
+        return employee
+
+    def get(self, field, default=None):
+        """Get a field as in a dictionary, to be compatible with the previous dictionaries
+
+        :param field: string
+        :param default: value if the field is not loaded
+        :return: value of the field
+        """
+        if field in self.__slots__ and field != 'extra':
+            value = getattr(self, field)
+            return default if value is None else value
+        if self.extra is not None:
+            return self.extra.get(field, default)
+        return default
+
+    def __getitem__(self, field):
+        value = self.get(field, KeyError)
+        if value is KeyError:
+            raise KeyError(field)
+        return value
+
+    def to_dict(self):
+        """All the loaded fields
+
+        :return: dict
+        """
+        info = {field: getattr(self, field) for field in ('id', 'access_id') + self.ACCESS_FIELDS}
+        info.update(self.extra or {})
+        return info
+
+    def __repr__(self) -> str:
+        return f'{self.first_name} {self.last_name} <{self.email}> #{self.id}'
@@ -15,3 +15,22 @@ class ApiError(Exception):
         if not msg:
            msg = ApiError.DEFAULT_MSG
         super().__init__(msg)
+
+
+class TooManyRequests(ApiError):
+    def __init__(self, retry_after=None):
+        super().__init__('Too many requests, rate limited by the api')
+        # Seconds that the api asked to wait, None if it didn't say
+        self.retry_after = retry_after
+
+
+class InteractionNotRecorded(Exception):
+    def __init__(self, method, url):
+        super().__init__(f'Request not recorded on the cassette: {method} {url}')
+
+
+class PeriodsNotSaved(ApiError):
+    def __init__(self, errors):
+        super().__init__(f"Can't save {len(errors)} worked periods")
+        # Position of the period: exception
+        self.errors = errors
@@ -1,18 +1,34 @@
+import collections
 import hashlib
+import itertools
 import logging
 import os
 import pickle
 import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date
 from http import client as http_client
 
-import requests
 from bs4 import BeautifulSoup
 
 from constants import BASE_PROJECT
-from factorial.exceptions import AuthenticationTokenNotFound, UserNotLoggedIn, ApiError
+from factorial.codec import get_codec, decompress, decompress_chunks
+from factorial.employee import Employee
+from factorial.exceptions import AuthenticationTokenNotFound, UserNotLoggedIn, ApiError, TooManyRequests, \
+    PeriodsNotSaved
+from factorial.gaps import find_period_gaps
+from factorial.journal import ShiftJournal
+from factorial.jsonstream import CHUNK_SIZE
 from factorial.loader.credentials.abstract_credentials import AbstractCredentials
 from factorial.loader.work.abstract_work import AbstractWork
+from factorial.pool import SHARED_CONNECTION_POOL
+from factorial.precompute import PrecomputeStore
+from factorial.profiling import Profiler
+from factorial.ratelimit import RateLimiter, SHARED_RATE_LIMITER
+from factorial.roster import RosterView, SHARED_ROSTER_CACHE
+from factorial.transport import RequestsTransport
 
 LOGGER = logging.getLogger('factorial.client')
 
@@ -38,24 +54,64 @@ class FactorialClient:
     # Calendar (get)
     CALENDAR_URL = '{}attendance/calendar'.format(BASE_NAME)
 
-    def __init__(self, email, password, cookie_file=None):
+    # Times to retry a request when the api answers too many requests
+    RATE_LIMIT_RETRIES = 3
+    # Max concurrent requests to modify the queued shifts
+    SHIFT_UPDATE_WORKERS = 8
+    # Max concurrent requests to save the worked periods of a day
+    DAY_SUBMIT_WORKERS = 4
+    # Max concurrent months read to find the gaps
+    GAPS_WORKERS = 4
+
+    def __init__(self, email, password, cookie_file=None, journal_folder=None, precompute_folder=None,
+                 rate_limiter=None, transport=None, profiler=None, employee_fields=(), codec=None,
+                 roster_cache=None, connection_pool=None):
         """Factorial client to automatically sign up the work
         :param email: (required) string, email to login on Factorial
         :param password: (required) string, password to login on Factorial
         :param cookie_file: (optional) string, file to save the cookies
+        :param journal_folder: (optional) string, folder to save the journal of the signed days
+        :param precompute_folder: (optional) string, folder to save the precomputed months
+        :param rate_limiter: (optional) RateLimiter, by default the one shared by all the clients of the process
+        :param transport: (optional) Transport to send the requests, eg: to record or replay them,
+            by default RequestsTransport
+        :param profiler: (optional) Profiler to time the phases of the run, by default disabled
+        :param employee_fields: (optional) iterable of string, fields of the accesses and employees to keep on
+            the current user and mates besides the ones used by the client, see Employee
+        :param codec: (optional) JsonCodec to decode the responses, by default the fastest installed
+        :param roster_cache: (optional) RosterCache with the employees of each company, by default the one shared
+            by all the clients of the process
+        :param connection_pool: (optional) ConnectionPool to send the requests, by default the one shared by all the
+            clients of the process, each client keeps its own cookies
         """
         self.email = email
         self.password = password
         self.current_user = {}
         self.mates = []
-        self.session = requests.Session()
+        self.employee_fields = tuple(employee_fields)
+        # Logger that adds the account to the records, eg: for the json logs
+        self.logger = logging.LoggerAdapter(LOGGER, {'account': email})
+        # Shift modifications waiting to be sent, shift id: payload
+        self.pending_shift_updates = {}
+        self.pending_shift_updates_lock = threading.Lock()
+        self.connection_pool = connection_pool or SHARED_CONNECTION_POOL
+        self.session = self.connection_pool.new_session()
+        self.rate_limiter = rate_limiter or SHARED_RATE_LIMITER
+        self.transport = transport or RequestsTransport()
+        self.profiler = profiler or Profiler(enabled=False)
+        self.codec = codec or get_codec()
+        self.roster_cache = roster_cache or SHARED_ROSTER_CACHE
         # Be able to save the cookies on a file specified, or save each user on a different email for multi account
         self.cookie_file = cookie_file or hashlib.sha512(email.encode('utf-8')).hexdigest()
         cookie_path = os.path.join(self.SESSIONS_FOLDER, self.cookie_file)
+        # Journal of the shifts saved for each day, to be able to resume an interrupted day
+        self.journal = ShiftJournal(self.cookie_file, folder=journal_folder)
+        # Months precomputed ahead, to sign a day without reading it
+        self.precompute = PrecomputeStore(self.cookie_file, folder=precompute_folder)
         if os.path.exists(cookie_path):
             with open(cookie_path, "rb") as file:
                 # TODO: Watch out the expiration of the cookie
-                LOGGER.info('Getting the session from cookies files')
+                self.logger.info('Getting the session from cookies files')
                 self.session.cookies.update(pickle.load(file))
 
     def login(self):
@@ -66,7 +122,7 @@ class FactorialClient:
         try:
             self.load_user_data()
             # Try to load the user info using the cookie, if can't login again using the username and password
-            LOGGER.info('Already logged in, re-login is not needed')
+            self.logger.info('Already logged in, re-login is not needed')
             return True
         except UserNotLoggedIn:
             payload = {
@@ -77,10 +133,11 @@ class FactorialClient:
                 'commit': 'Iniciar sesión'
             }
 
-            response = self.session.post(url=self.LOGIN_PAGE_URL, data=payload)
+            with self.profiler.phase('login'):
+                response = self.request('post', self.LOGIN_PAGE_URL, RateLimiter.AUTH, data=payload)
             loggedin = response.status_code == http_client.OK
             if loggedin:
-                LOGGER.info('Login successfully')
+                self.logger.info('Login successfully')
                 # Load user data
                 self.load_user_data()
                 # Save the cookies if is logged in
@@ -88,31 +145,35 @@ class FactorialClient:
                     os.mkdir(self.SESSIONS_FOLDER)
                 with open(os.path.join(self.SESSIONS_FOLDER, self.cookie_file), "wb") as file:
                     pickle.dump(self.session.cookies, file)
-                    LOGGER.info('Sessions saved')
+                    self.logger.info('Sessions saved')
             return loggedin
 
     def generate_new_token(self):
         """Generate new token to be able to login"""
-        response = self.session.get(url=self.LOGIN_PAGE_URL)
-        soup = BeautifulSoup(response.text, 'html5lib')
-        auth_token = soup.find('input', attrs={'name': 'authenticity_token'})
+        with self.profiler.phase('generate_new_token'):
+            response = self.request('get', self.LOGIN_PAGE_URL, RateLimiter.AUTH)
+            soup = BeautifulSoup(response.text, 'html5lib')
+            auth_token = soup.find('input', attrs={'name': 'authenticity_token'})
         token_value = auth_token.get('value')
         if not token_value:
             raise AuthenticationTokenNotFound()
         return token_value
 
     @staticmethod
-    def load_from_settings(credentials_loader: AbstractCredentials):
+    def load_from_settings(credentials_loader: AbstractCredentials, **kwargs):
         """Login from the settings if the session still valid from the saved cookies, otherwise ask for the password
 
         :param credentials_loader: AbstractFactorialLoader load email and password from abstract class
+        :param kwargs: extra arguments for the FactorialClient, eg: transport
         :return: FactorialClient
         """
         factorial_client = FactorialClient(email=credentials_loader.get_email(),
-                                           password=credentials_loader.get_password())
-        if not factorial_client.login():
-            # Session valid with the current cookie
-            raise ApiError('Cannot login with the given credentials')
+                                           password=credentials_loader.get_password(),
+                                           **kwargs)
+        with factorial_client.profiler.phase('load_from_settings'):
+            if not factorial_client.login():
+                # Session valid with the current cookie
+                raise ApiError('Cannot login with the given credentials')
         return factorial_client
 
     @staticmethod
@@ -193,15 +254,75 @@ class FactorialClient:
         # Pass to hours and minutes
         return FactorialClient.convert_to_time(variated_minutes)
 
-    def check_status_code(self, status_code, status_code_error, message=None):
+    def request(self, method, url, endpoint_class, **kwargs):
+        """Do a request to the api respecting the rate limits
+
+        If the api answers too many requests, the endpoint class is paused for all the clients sharing the
+        rate limiter, as long as the Retry-After header says, and the request is retried.
+        :param method: string, http method eg: 'get'
+        :param url: string
+        :param endpoint_class: string, RateLimiter.AUTH, RateLimiter.READ or RateLimiter.WRITE
+        :param kwargs: extra arguments for the request, eg: params, data
+        :return: Response
+        """
+        retries = 0
+        while True:
+            self.rate_limiter.acquire(endpoint_class)
+            response = self.transport.send(self.session, method, url, **kwargs)
+            if response.status_code != http_client.TOO_MANY_REQUESTS or retries >= self.RATE_LIMIT_RETRIES:
+                return response
+            # Return the connection of a streamed response to the pool before waiting
+            response.close()
+            self.rate_limiter.backoff(endpoint_class, response.headers.get('Retry-After'))
+            retries += 1
+
+    def stream_json_array(self, url, endpoint_class, **kwargs):
+        """Get a json array with the codec of the client, the stdlib codec decodes its items while the response
+        is downloaded, without keeping the whole response in memory, orjson decodes it at once
+
+        :param url: string
+        :param endpoint_class: string, eg: RateLimiter.READ
+        :param kwargs: extra arguments for the request, eg: params
+        :return: generator of the items
+        """
+        response = self.request('get', url, endpoint_class, stream=True, **kwargs)
+        try:
+            self.check_response(response, http_client.OK)
+            yield from self.codec.iter_array(decompress_chunks(response.iter_content(CHUNK_SIZE)))
+        finally:
+            response.close()
+
+    def decode_json(self, response):
+        """Decode the json of a response with the codec of the client, the body can be compressed with
+        gzip or deflate
+
+        :param response: Response
+        :return: decoded json
+        """
+        return self.codec.loads(decompress(response.content))
+
+    def check_response(self, response, status_code_error, message=None):
+        """Check if the call of the endpoint is correct, see check_status_code
+
+        :param response: Response
+        :param status_code_error: HttpStatus
+        :param message: string
+        """
+        self.check_status_code(response.status_code, status_code_error, message,
+                               retry_after=response.headers.get('Retry-After'))
+
+    def check_status_code(self, status_code, status_code_error, message=None, retry_after=None):
         """Check if the call of the endpoint is correct
 
         :param status_code: HttpStatus
         :param status_code_error: HttpStatus
         :param message: string
+        :param retry_after: string, value of the Retry-After header of the response
         """
         if status_code == http_client.UNAUTHORIZED:
             raise UserNotLoggedIn()
+        elif status_code == http_client.TOO_MANY_REQUESTS:
+            raise TooManyRequests(RateLimiter.parse_retry_after(retry_after) if retry_after else None)
         elif status_code != status_code_error:
             raise ApiError(message)
 
@@ -287,70 +408,229 @@ class FactorialClient:
     def worked_day(self, work_loader: AbstractWork, day=date.today()):
         """Mark today as worked day
 
+        Every step is written on the journal of the day, so if the process dies in the middle the next
+        call resumes saving only the pending worked periods, reading the day once to skip the ones saved but
+        not written on the journal.
         :param work_loader: AbstractCredentialLoader load the working hours
         :param day: date to save the worked day, by default is today
         """
-        already_work = self.get_day(year=day.year, month=day.month, day=day.day)
-        if already_work:
-            if work_loader.get_resave():
-                for worked_period in already_work:
-                    self.delete_worked_period(worked_period.get('id'))
+        with self.profiler.phase('worked_day'):
+            self.save_worked_day(work_loader, day)
+
+    def save_worked_day(self, work_loader: AbstractWork, day):
+        """Save the worked day following the journal, see worked_day
+
+        :param work_loader: AbstractCredentialLoader load the working hours
+        :param day: date to save the worked day
+        """
+        journal_state = self.journal.load(day)
+        if journal_state['finished'] and not work_loader.get_resave():
+            self.logger.info('Day already sign')
+            return
+
+        # Finish the deletion of an interrupted resave
+        for shift_id in journal_state['deleting']:
+            try:
+                self.delete_worked_period(shift_id)
+            except ApiError:
+                # Deleted before the process died, but not written on the journal
+                self.logger.info('Shift %s already deleted', shift_id)
+            self.journal.deleted(day, shift_id)
+
+        month_plan = self.get_month_plan(work_loader, day)
+        period_id = month_plan['period_id'] if month_plan else None
+        if journal_state['periods'] is not None and not journal_state['finished']:
+            self.logger.info('Resuming the worked day %s from the journal', day)
+            worked_periods = journal_state['periods']
+            already_added = set(journal_state['added'])
+            if len(already_added) < len(worked_periods):
+                # The process could have died after saving a period but before writing it on the journal
+                for index in self.find_saved_periods(day, worked_periods, already_added):
+                    self.journal.added(day, index)
+                    already_added.add(index)
+        elif month_plan and day.day in month_plan['leave_days']:
+            self.logger.info("Can't sign today %s, because are vacations", day)
+            self.journal.plan(day, [])
+            self.journal.finish(day)
+            return
+        elif month_plan and day.day not in month_plan['laborable_days']:
+            self.logger.info("Can't sign today %s, because is not laborable", day)
+            self.journal.plan(day, [])
+            self.journal.finish(day)
+            return
+        else:
+            if month_plan and day.day not in month_plan['signed_days']:
+                # Precomputed, there is no need to read the day
+                worked_periods = self.get_planned_periods(month_plan, work_loader, day)
             else:
-                LOGGER.info('Day already sign')
-                return
-
-        add_worked_period_kwargs = {
-            'year': day.year,
-            'month': day.month,
-            'day': day.day,
-            # Dynamic over loop fields
-            'start_hour': 0,
-            'start_minute': 0,
-            'end_hour': 0,
-            'end_minute': 0
+                period_id = None
+                already_work = self.get_day(year=day.year, month=day.month, day=day.day)
+                if already_work:
+                    if work_loader.get_resave():
+                        shift_ids = [worked_period.get('id') for worked_period in already_work]
+                        self.journal.deleting(day, shift_ids)
+                        for shift_id in shift_ids:
+                            self.delete_worked_period(shift_id)
+                            self.journal.deleted(day, shift_id)
+                    else:
+                        self.logger.info('Day already sign')
+                        return
+
+                worked_periods = self.generate_worked_periods(
+                    work_loader.get_start_hour(),
+                    work_loader.get_end_hour(),
+                    work_loader.get_minutes_variation(),
+                    work_loader.get_breaks()
+                )
+            self.journal.plan(day, worked_periods)
+            already_added = set()
+
+        pending_periods = {
+            index: worked_period
+            for index, worked_period in enumerate(worked_periods)
+            if index not in already_added
         }
-        worked_periods = self.generate_worked_periods(
+        try:
+            saved = self.submit_day(day.year, day.month, day.day, pending_periods, period_id=period_id,
+                                    on_saved=lambda index: self.journal.added(day, index))
+        except PeriodsNotSaved as err:
+            for index, error in err.errors.items():
+                self.logger.warning("Can't save the worked period %s of the day %s: %s", index, day, error)
+            if period_id is not None:
+                # The precomputed month could be wrong, revalidate it on the next call
+                self.precompute.remove(day.year, day.month)
+            raise
+        if not saved:
+            # Vacations, there is nothing to save
+            for index in pending_periods:
+                self.journal.added(day, index)
+        self.journal.finish(day)
+
+    def find_saved_periods(self, day, worked_periods, already_added):
+        """Find the planned worked periods that are already saved on the day, but not on the journal
+
+        :param day: date
+        :param worked_periods: list of dict(start_hour, start_minute, end_hour, end_minute)
+        :param already_added: set of int, positions of the periods written on the journal
+        :return: list of int, positions of the periods already saved
+        """
+        saved_times = collections.Counter(
+            tuple(self.split_time(shift.get('clock_in'))) + tuple(self.split_time(shift.get('clock_out')))
+            for shift in self.get_day(year=day.year, month=day.month, day=day.day)
+            if shift.get('clock_in') and shift.get('clock_out')
+        )
+        saved = []
+        for index, worked_period in enumerate(worked_periods):
+            if index in already_added:
+                continue
+            times = (worked_period['start_hour'], worked_period['start_minute'],
+                     worked_period['end_hour'], worked_period['end_minute'])
+            if saved_times[times] > 0:
+                saved_times[times] -= 1
+                self.logger.info('Worked period %s of the day %s already saved', index, day)
+                saved.append(index)
+        return saved
+
+    def precompute_month(self, work_loader: AbstractWork, year, month):
+        """Read and save ahead everything needed to sign the days of a month: the period, the laborable and leave
+        days, the already signed days and the schedule of each day to sign
+
+        Then worked_day only has to save the shifts, see PrecomputeStore.
+        :param work_loader: AbstractWork load the working hours
+        :param year: integer
+        :param month: integer
+        :return: dict, the precomputed month
+        """
+        with self.profiler.phase('precompute_month'):
+            period_id = self.get_period_id(year=year, month=month)
+            laborable_days = []
+            leave_days = []
+            for calendar_day in self.get_calendar(year=year, month=month):
+                calendar_date = date.fromisoformat(calendar_day.get('date'))
+                if calendar_day.get('is_leave'):
+                    leave_days.append(calendar_date.day)
+                elif calendar_day.get('is_laborable'):
+                    laborable_days.append(calendar_date.day)
+            signed_days = sorted({shift.get('day') for shift in self.get_period_shifts(period_id)})
+            schedules = {
+                str(day): PrecomputeStore.pack_periods(self.generate_worked_periods(
+                    work_loader.get_start_hour(),
+                    work_loader.get_end_hour(),
+                    work_loader.get_minutes_variation(),
+                    work_loader.get_breaks()
+                ))
+                for day in laborable_days
+                if day not in signed_days
+            }
+            month_plan = {
+                'year': year,
+                'month': month,
+                'employee_id': self.current_user.get('id'),
+                'period_id': period_id,
+                'laborable_days': laborable_days,
+                'leave_days': leave_days,
+                'signed_days': signed_days,
+                'work': PrecomputeStore.get_work_fingerprint(work_loader),
+                'schedules': schedules,
+                'created': time.time()
+            }
+            self.precompute.save(month_plan)
+        self.logger.info('Precomputed the month %04d-%02d', year, month)
+        return month_plan
+
+    def get_month_plan(self, work_loader: AbstractWork, day):
+        """Get the precomputed month of a day, revalidating it if it's stale
+
+        :param work_loader: AbstractWork load the working hours
+        :param day: date
+        :return: dict, the precomputed month, None if the month was not precomputed
+        """
+        month_plan = self.precompute.load(day.year, day.month)
+        if month_plan is None:
+            return None
+        if self.precompute.is_stale(month_plan) or month_plan.get('employee_id') != self.current_user.get('id'):
+            self.logger.info('Revalidating the precomputed month %04d-%02d', day.year, day.month)
+            month_plan = self.precompute_month(work_loader, day.year, day.month)
+        return month_plan
+
+    def get_planned_periods(self, month_plan, work_loader: AbstractWork, day):
+        """Get the precomputed worked periods of a day, or generate them if the work settings have changed
+
+        :param month_plan: dict, the precomputed month
+        :param work_loader: AbstractWork load the working hours
+        :param day: date
+        :return: list of periods
+        """
+        packed_periods = month_plan['schedules'].get(str(day.day))
+        if packed_periods and month_plan.get('work') == PrecomputeStore.get_work_fingerprint(work_loader):
+            return PrecomputeStore.unpack_periods(packed_periods)
+        return self.generate_worked_periods(
             work_loader.get_start_hour(),
             work_loader.get_end_hour(),
             work_loader.get_minutes_variation(),
             work_loader.get_breaks()
         )
-        for worked_period in worked_periods:
-            start_hour = worked_period.get('start_hour')
-            start_minute = worked_period.get('start_minute')
-            end_hour = worked_period.get('end_hour')
-            end_minute = worked_period.get('end_minute')
-            add_worked_period_kwargs.update({
-                'start_hour': start_hour,
-                'start_minute': start_minute,
-                'end_hour': end_hour,
-                'end_minute': end_minute,
-            })
-            if self.add_worked_period(**add_worked_period_kwargs):
-                LOGGER.info('Saved worked period for the day {0:s} between {1:02d}:{2:02d} - {3:02d}:{4:02d}'.format(
-                    day.isoformat(),
-                    start_hour, start_minute,
-                    end_hour, end_minute))
 
     def logout(self):
         """Logout invalidating that session, invalidating the cookie _factorial_session
 
         :return: bool
         """
-        response = self.session.delete(url=self.SESSION_URL)
+        response = self.request('delete', self.SESSION_URL, RateLimiter.AUTH)
         logout_correcty = response.status_code == http_client.NO_CONTENT
-        LOGGER.info('Logout successfully {}'.format(logout_correcty))
-        self.session = requests.Session()
+        self.logger.info('Logout successfully %s', logout_correcty)
+        # Keep the session to reuse the connections, without the cookies of the closed session
+        self.session.cookies.clear()
         path_file = os.path.join(self.SESSIONS_FOLDER, self.cookie_file)
         if os.path.exists(path_file):
             os.remove(path_file)
-            LOGGER.info('Logout: Removed cookies file')
-        self.mates.clear()
+            self.logger.info('Logout: Removed cookies file')
+        self.mates = []
         self.current_user = {}
         return logout_correcty
 
     def load_employees(self):
-        """Load employees info
+        """Load employees info on the current user and mates, the response is decoded with the codec of the client
 
         Example:
         [
@@ -374,21 +654,20 @@ class FactorialClient:
              }
         ]
         """
-        LOGGER.info("Loading employees")
-        employee_response = self.session.get(self.EMPLOYEE_URL)
-        self.check_status_code(employee_response.status_code, http_client.OK)
-        employee_json = employee_response.json()
-        for employee in employee_json:
-            # Update the user info that match the self.mates[n].id with employee.access_id
-            for mate in self.mates:
-                if mate.get('id') == employee.get('access_id'):
-                    mate.update(employee)
-
-            if self.current_user.get('id') == employee.get('access_id'):
-                self.current_user.update(employee)
+        self.logger.info("Loading employees")
+        with self.profiler.phase('load_employees'):
+            users = {mate.access_id: mate for mate in self.mates}
+            if self.current_user:
+                users[self.current_user.access_id] = self.current_user
+            for employee in self.stream_json_array(self.EMPLOYEE_URL, RateLimiter.READ):
+                # Update the user info that match the access id with employee.access_id
+                user = users.get(employee.get('access_id'))
+                if user is not None:
+                    user.update_employee(employee, self.employee_fields)
 
     def load_user_data(self):
-        """Load info about your user
+        """Load info about your user, the current user and mates are saved as Employee, only with the fields
+        used by the client and the employee_fields
         Example:
         ```
         [
@@ -414,21 +693,78 @@ class FactorialClient:
         ]
         ```
         """
-        self.mates.clear()
+        self.mates = []
         self.current_user = {}
-        response = self.session.get(url=self.USER_INFO_URL)
-        self.check_status_code(response.status_code, http_client.OK)
-        json_response = response.json()
-        for user in json_response:
-            current_user = user
-            if current_user.get('current', False):
+        with self.profiler.phase('load_user_data'):
+            stream = self.stream_json_array(self.USER_INFO_URL, RateLimiter.READ)
+            try:
+                first_access = next(stream, None)
+                if first_access is None:
+                    return
+                accesses = itertools.chain([first_access], stream)
+                # All the accesses are of the same company
+                company_id = first_access.get('company_id')
+                roster = self.roster_cache.get(company_id, self.employee_fields)
+                if roster is None:
+                    with self.roster_cache.loading(company_id):
+                        # Another client could have loaded it meanwhile
+                        roster = self.roster_cache.get(company_id, self.employee_fields)
+                        if roster is None:
+                            self.load_roster(company_id, accesses)
+                            return
+                loaded = self.load_from_roster(roster, accesses)
+            finally:
+                # Don't wait to download the rest of the accesses
+                stream.close()
+
+        if not loaded:
+            # The current user is not on the roster yet, eg: a new employee
+            self.roster_cache.invalidate(company_id)
+            self.load_user_data()
+
+    def load_roster(self, company_id, accesses):
+        """Load the accesses and employees of the company and save them on the roster cache
+
+        :param company_id: int
+        :param accesses: iterable of dict, accesses of the company
+        """
+        for user in accesses:
+            current_user = Employee(user, self.employee_fields)
+            if current_user.current:
                 self.current_user = current_user
             else:
                 self.mates.append(current_user)
 
         self.load_employees()
 
-    def get_period(self, year, month):
+        roster = list(self.mates)
+        if self.current_user:
+            # The roster is shared with the other users of the company
+            roster.append(self.current_user.copy(current=False))
+        roster = self.roster_cache.put(company_id, roster, self.employee_fields)
+        if self.current_user:
+            self.mates = RosterView(roster, self.current_user.access_id)
+
+    def load_from_roster(self, roster, accesses):
+        """Load the current user and mates from the roster of the company, only looking for the current access
+
+        :param roster: tuple of Employee
+        :param accesses: iterable of dict, accesses of the company
+        :return: bool, False if the current user is not on the roster
+        """
+        current_access = next((access for access in accesses if access.get('current', False)), None)
+        if current_access is None:
+            return True
+        access_id = current_access.get('id')
+        current_user = next((employee for employee in roster if employee.access_id == access_id), None)
+        if current_user is None:
+            return False
+        self.logger.info('Loaded the employees from the roster of the company')
+        self.current_user = current_user.copy(current=True)
+        self.mates = RosterView(roster, access_id)
+        return True
+
+    def get_period(self, year, month, employee_id=None):
         """Get the info a period
 
         Example:
@@ -513,17 +849,19 @@ class FactorialClient:
         ]
         :param year: integer
         :param month: integer
+        :param employee_id: (optional) integer, by default the current user
         :return: dictionary
         """
         params = {
             'year': year,
             'month': month,
-            'employee_id': self.current_user.get('id', '')
+            'employee_id': employee_id or self.current_user.get('id', '')
         }
 
-        response = self.session.get(url=self.PERIODS_URL, params=params)
-        self.check_status_code(response.status_code, http_client.OK)
-        return response.json()
+        with self.profiler.phase('get_period'):
+            response = self.request('get', self.PERIODS_URL, RateLimiter.READ, params=params)
+            self.check_response(response, http_client.OK)
+            return self.decode_json(response)
 
     def get_shift(self, year, month):
         """Get the current calendar with its worked days
@@ -534,13 +872,21 @@ class FactorialClient:
         """
         period = self.get_period(year=year, month=month)
         current_period = period[0]
-        period_id = current_period['id']
+        return self.get_period_shifts(current_period['id'])
+
+    def get_period_shifts(self, period_id):
+        """Get the worked shifts of a period
+
+        :param period_id: integer
+        :return dictionary
+        """
         params = {
             'period_id': period_id
         }
-        response = self.session.get(self.SHIFT_URL, params=params)
-        self.check_status_code(response.status_code, http_client.OK)
-        return response.json()
+        with self.profiler.phase('get_shift'):
+            response = self.request('get', self.SHIFT_URL, RateLimiter.READ, params=params)
+            self.check_response(response, http_client.OK)
+            return self.decode_json(response)
 
     def get_day(self, year, month, day):
         """Get a specific worked day
@@ -558,21 +904,24 @@ class FactorialClient:
                 worked_hours.append(day_it)
         return worked_hours
 
-    def get_calendar(self, year, month, **kwargs):
+    def get_calendar(self, year, month, employee_id=None, **kwargs):
         """Get all the laborable and left days
 
         :param year: int
         :param month: int
+        :param employee_id: (optional) int, by default the current user
+        :param kwargs: filter the days by the value of their fields, eg: is_leave=True
         :return: list of dictionary
         """
         params = {
-            'id': self.current_user.get('id'),
+            'id': employee_id or self.current_user.get('id'),
             'year': year,
             'month': month
         }
-        response = self.session.get(self.CALENDAR_URL, params=params)
-        self.check_status_code(response.status_code, http_client.OK)
-        response = response.json()
+        with self.profiler.phase('get_calendar'):
+            response = self.request('get', self.CALENDAR_URL, RateLimiter.READ, params=params)
+            self.check_response(response, http_client.OK)
+            response = self.decode_json(response)
         for param, value in kwargs.items():
             response = [day for day in response if day.get(param) == value]
         return response
@@ -597,24 +946,109 @@ class FactorialClient:
         :param end_minute: integer
         :return bool: correctly saved
         """
-        # Check if are vacations
+        if self.is_leave_day(year, month, day):
+            return False
+        period_id = self.get_period_id(year=year, month=month)
+        self.post_worked_period(period_id, day, start_hour, start_minute, end_hour, end_minute)
+        return True
+
+    def is_leave_day(self, year, month, day):
+        """Check if the day are vacations, that can't be signed
+
+        :param year: integer
+        :param month: integer
+        :param day: integer
+        :return: bool
+        """
         calendar = self.get_calendar(year=year, month=month, is_leave=True)
         formatted_date = f'{year:04d}-{month:02d}-{day:02d}'
         for calendar_day in calendar:
             if calendar_day.get('date') == formatted_date:
-                LOGGER.info(f"Can't sign today {formatted_date}, because are vacations")
-                return False
+                self.logger.info("Can't sign today %s, because are vacations", formatted_date)
+                return True
+        return False
+
+    def get_period_id(self, year, month):
+        """Get the id of the period of a month
+
+        :param year: integer
+        :param month: integer
+        :return: integer
+        """
         period = self.get_period(year=year, month=month)
         current_period = period[0]
-        period_id = current_period['id']
+        return current_period['id']
+
+    def post_worked_period(self, period_id, day, start_hour, start_minute, end_hour, end_minute):
+        """Save a worked period on a known period
+
+        :param period_id: integer
+        :param day: integer
+        :param start_hour: integer
+        :param start_minute: integer
+        :param end_hour: integer
+        :param end_minute: integer
+        """
         payload = {
             'clock_in': f'{start_hour}:{start_minute}',
             'clock_out': f'{end_hour}:{end_minute}',
             'day': day,
             'period_id': period_id
         }
-        response = self.session.post(self.SHIFT_URL, data=payload)
-        self.check_status_code(response.status_code, http_client.CREATED)
+        with self.profiler.phase('post_shift'):
+            response = self.request('post', self.SHIFT_URL, RateLimiter.WRITE, data=payload)
+            self.check_response(response, http_client.CREATED)
+
+    def submit_day(self, year, month, day, worked_periods, max_workers=None, on_saved=None, period_id=None):
+        """Save all the worked periods of a day concurrently
+
+        The vacations and the period are checked only once for all the worked periods, and then all of them
+        are saved at the same time, so saving a day takes about the same time as saving one period.
+        :param year: integer
+        :param month: integer
+        :param day: integer
+        :param worked_periods: list of periods, or dict position: period,
+            period: dict(start_hour, start_minute, end_hour, end_minute)
+        :param max_workers: (optional) int, max concurrent requests, by default DAY_SUBMIT_WORKERS
+        :param on_saved: (optional) function(position) called when a period is saved, from its thread
+        :param period_id: (optional) integer, period already known, eg: precomputed, then neither the period nor
+            the vacations are read
+        :return bool: correctly saved, False if the day are vacations
+        :raise PeriodsNotSaved: with the error of each period that couldn't be saved, after trying all of them
+        """
+        if isinstance(worked_periods, list):
+            worked_periods = dict(enumerate(worked_periods))
+        if not worked_periods:
+            return False
+        if period_id is None:
+            if self.is_leave_day(year, month, day):
+                return False
+            period_id = self.get_period_id(year=year, month=month)
+
+        def save(index, worked_period):
+            start_hour = worked_period.get('start_hour')
+            start_minute = worked_period.get('start_minute')
+            end_hour = worked_period.get('end_hour')
+            end_minute = worked_period.get('end_minute')
+            self.post_worked_period(period_id, day, start_hour, start_minute, end_hour, end_minute)
+            self.logger.info('Saved worked period for the day %04d-%02d-%02d between %02d:%02d - %02d:%02d',
+                             year, month, day, start_hour, start_minute, end_hour, end_minute)
+            if on_saved:
+                on_saved(index)
+
+        errors = {}
+        workers = min(max_workers or self.DAY_SUBMIT_WORKERS, len(worked_periods))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(save, index, worked_period): index
+                for index, worked_period in worked_periods.items()
+            }
+            for future in as_completed(futures):
+                error = future.exception()
+                if error is not None:
+                    errors[futures[future]] = error
+        if errors:
+            raise PeriodsNotSaved(errors)
         return True
 
     def delete_worked_period(self, shift_id):
@@ -623,8 +1057,101 @@ class FactorialClient:
         :param shift_id: integer
         """
         url = f'{self.SHIFT_URL}/{shift_id}'
-        response = self.session.delete(url)
-        self.check_status_code(response.status_code, http_client.NO_CONTENT)
+        with self.profiler.phase('delete_shift'):
+            response = self.request('delete', url, RateLimiter.WRITE)
+            self.check_response(response, http_client.NO_CONTENT)
+
+    @staticmethod
+    def get_shift_payload(period_id=None, start_hour=None, start_minute=None, end_hour=None, end_minute=None,
+                          observation=None):
+        """Fields to modify of a shift, the fields not given are not modified
+
+        :param period_id: integer
+        :param start_hour: integer
+        :param start_minute: integer
+        :param end_hour: integer
+        :param end_minute: integer
+        :param observation: string
+        :return: dict
+        """
+        payload = {}
+        if start_hour is not None and start_minute is not None:
+            payload['clock_in'] = f"{start_hour}:{start_minute}"
+        if end_hour is not None and end_minute is not None:
+            payload['clock_out'] = f"{end_hour}:{end_minute}"
+        if period_id is not None:
+            payload['period_id'] = period_id
+        if observation is not None:
+            payload['observations'] = observation
+        return payload
+
+    def update_shift(self, shift_id, **fields):
+        """Modify the clock in, clock out and observation of a shift with a single request
+
+        :param shift_id: integer
+        :param fields: fields to modify, see get_shift_payload
+        """
+        self.send_shift_update(shift_id, self.get_shift_payload(**fields))
+
+    def send_shift_update(self, shift_id, payload):
+        """Send the modified fields of a shift
+
+        :param shift_id: integer
+        :param payload: dict, see get_shift_payload
+        """
+        url = f'{self.SHIFT_URL}/{shift_id}'
+        with self.profiler.phase('patch_shift'):
+            response = self.request('patch', url, RateLimiter.WRITE, data=payload)
+            self.check_response(response, http_client.OK)
+
+    def queue_shift_update(self, shift_id, **fields):
+        """Queue the modification of a shift, the modifications of the same shift are merged and sent with
+        a single request by flush_shift_updates
+
+        Example to fix the clock in and add an observation with one request:
+        client.queue_shift_update(1, start_hour=7, start_minute=30, end_hour=15, end_minute=30)
+        client.queue_shift_update(1, observation='Forgot to sign')
+        client.flush_shift_updates()
+        :param shift_id: integer
+        :param fields: fields to modify, see get_shift_payload
+        """
+        with self.pending_shift_updates_lock:
+            self.pending_shift_updates.setdefault(shift_id, {}).update(self.get_shift_payload(**fields))
+
+    def flush_shift_updates(self, max_workers=None):
+        """Send all the queued shift modifications concurrently, one request for each shift
+
+        The modifications that fail stay queued to retry them with the next flush.
+        :param max_workers: (optional) int, max concurrent requests, by default SHIFT_UPDATE_WORKERS
+        :return: dict, shift id: exception of the shifts that couldn't be modified
+        """
+        with self.pending_shift_updates_lock:
+            pending = self.pending_shift_updates
+            self.pending_shift_updates = {}
+        if not pending:
+            return {}
+
+        errors = {}
+        with ThreadPoolExecutor(max_workers=max_workers or self.SHIFT_UPDATE_WORKERS) as executor:
+            futures = {
+                executor.submit(self.send_shift_update, shift_id, payload): shift_id
+                for shift_id, payload in pending.items()
+            }
+            for future in as_completed(futures):
+                shift_id = futures[future]
+                error = future.exception()
+                if error is not None:
+                    self.logger.warning("Can't modify the shift %s: %s", shift_id, error)
+                    errors[shift_id] = error
+
+        if errors:
+            with self.pending_shift_updates_lock:
+                for shift_id in errors:
+                    # Keep the newer modifications queued meanwhile
+                    fields = pending[shift_id]
+                    fields.update(self.pending_shift_updates.get(shift_id, {}))
+                    self.pending_shift_updates[shift_id] = fields
+        return errors
 
     def modify_worked_period(self, shift_id, period_id, start_hour, start_minute, end_hour, end_minute):
         """Modify the clock in and clock out of a specific day
@@ -636,14 +1163,8 @@ class FactorialClient:
         :param end_hour: integer
         :param end_minute: integer
         """
-        url = f'{self.SHIFT_URL}/{shift_id}'
-        payload = {
-            'clock_in': f"{start_hour}:{start_minute}",
-            'clock_out': f"{end_hour}:{end_minute}",
-            'period_id': period_id,
-        }
-        response = self.session.patch(url, data=payload)
-        self.check_status_code(response.status_code, http_client.OK)
+        self.update_shift(shift_id, period_id=period_id, start_hour=start_hour, start_minute=start_minute,
+                          end_hour=end_hour, end_minute=end_minute)
 
     def add_observation(self, shift_id, observation=None):
         """Add observation for a day
@@ -651,10 +1172,53 @@ class FactorialClient:
         :param shift_id: integer
         :param observation: string
         """
-        url = f'{self.SHIFT_URL}/{shift_id}'
-        payload = {
-            'observations': observation
-        }
+        self.update_shift(shift_id, observation=observation)
 
-        response = self.session.patch(url=url, data=payload)
-        self.check_status_code(response.status_code, http_client.OK)
+    def find_gaps(self, months, employee_ids=None, min_minutes=None, until=None, max_workers=None):
+        """Find the laborable days not signed, or with less minutes than expected, of several months and employees
+
+        Only the period, with the worked minutes of each day on its distribution, and the calendar of each month
+        are read, without getting the shifts, see get_gap_shifts to get the shifts of the days to correct.
+        :param months: iterable of tuple(year, month)
+        :param employee_ids: (optional) iterable of int, by default the current user
+        :param min_minutes: (optional) int, days with less minutes are gaps, by default only the days without minutes
+        :param until: (optional) date, don't check the days after it, by default today
+        :param max_workers: (optional) int, max concurrent months read, by default GAPS_WORKERS
+        :return: list of DayGap sorted by employee and day
+        """
+        employee_ids = list(employee_ids or [self.current_user.get('id')])
+
+        def find_month_gaps(employee_id, year, month):
+            gaps = []
+            for period in self.get_period(year=year, month=month, employee_id=employee_id):
+                calendar = self.get_calendar(year=year, month=month, employee_id=employee_id)
+                gaps.extend(find_period_gaps(employee_id, period, calendar, min_minutes=min_minutes, until=until))
+            return gaps
+
+        gaps = []
+        with ThreadPoolExecutor(max_workers=max_workers or self.GAPS_WORKERS) as executor:
+            futures = [
+                executor.submit(find_month_gaps, employee_id, year, month)
+                for employee_id in employee_ids
+                for year, month in months
+            ]
+            for future in futures:
+                gaps.extend(future.result())
+        return sorted(gaps, key=lambda gap: (gap.employee_id, gap.day))
+
+    def get_gap_shifts(self, gaps):
+        """Get the shifts of the days with gaps, reading the shifts only of the periods with gaps
+
+        :param gaps: iterable of DayGap, see find_gaps
+        :return: dict DayGap: list of shifts of the day
+        """
+        shifts_by_period = {}
+        gap_shifts = {}
+        for gap in gaps:
+            if gap.period_id not in shifts_by_period:
+                shifts_by_period[gap.period_id] = self.get_period_shifts(gap.period_id)
+            gap_shifts[gap] = [
+                shift for shift in shifts_by_period[gap.period_id]
+                if shift.get('day') == gap.day.day
+            ]
+        return gap_shifts
@@ -0,0 +1,39 @@
+from datetime import date
+from typing import NamedTuple, Optional
+
+
+class DayGap(NamedTuple):
+    # Employee that didn't sign the day
+    employee_id: int
+    # Period of the month of the day, to get its shifts
+    period_id: int
+    day: date
+    # Minutes signed on the day
+    worked_minutes: int
+    # Minimum minutes to sign, None if only the days without any minute are gaps
+    min_minutes: Optional[int]
+
+
+def find_period_gaps(employee_id, period, calendar, min_minutes=None, until=None):
+    """Find the laborable days of a period without enough worked minutes, from its distribution
+
+    :param employee_id: int
+    :param period: dict, period with the worked minutes of each day on the distribution, see get_period
+    :param calendar: list of dict, days of the calendar of the month, see get_calendar
+    :param min_minutes: (optional) int, days with less minutes are gaps, by default only the days without minutes
+    :param until: (optional) date, don't check the days after it, by default today
+    :return: list of DayGap
+    """
+    until = until or date.today()
+    distribution = period.get('distribution') or []
+    gaps = []
+    for calendar_day in calendar:
+        if not calendar_day.get('is_laborable') or calendar_day.get('is_leave'):
+            continue
+        day = date.fromisoformat(calendar_day.get('date'))
+        if day > until:
+            continue
+        worked_minutes = distribution[day.day - 1] if day.day <= len(distribution) else 0
+        if worked_minutes == 0 or (min_minutes is not None and worked_minutes < min_minutes):
+            gaps.append(DayGap(employee_id, period.get('id'), day, worked_minutes, min_minutes))
+    return gaps
@@ -0,0 +1,143 @@
+import logging
+import os
+import threading
+
+from constants import BASE_PROJECT
+from factorial.codec import DEFAULT_CODEC
+
+LOGGER = logging.getLogger('factorial.client')
+
+
+class ShiftJournal:
+    # Folder to save the journals, one sub folder for each account
+    JOURNAL_FOLDER = os.path.join(BASE_PROJECT, "journal")
+
+    # Entries
+    # The worked periods that are going to be saved for the day
+    PLANNED = 'planned'
+    # A worked period was saved, or skipped because it can't be saved (eg: vacations)
+    ADDED = 'added'
+    # An already saved shift that is going to be deleted to resave the day
+    DELETING = 'deleting'
+    # An already saved shift was deleted
+    DELETED = 'deleted'
+    # All the worked periods of the day have been processed
+    FINISHED = 'finished'
+
+    def __init__(self, account, folder=None):
+        """Append only journal of the shift mutations of an account, to resume an interrupted day
+
+        Each day is saved on a different file with one json entry per line, every entry is flushed to disk
+        before continuing, so if the process dies the next run knows exactly what was done.
+        :param account: (required) string, unique name of the account, eg: the cookie file
+        :param folder: (optional) string, folder to save the journals
+        """
+        self.folder = os.path.join(folder or self.JOURNAL_FOLDER, account)
+        self.lock = threading.Lock()
+
+    def get_path(self, day):
+        """Path of the journal of a day
+
+        :param day: date
+        :return: string
+        """
+        return os.path.join(self.folder, f'{day.isoformat()}.jsonl')
+
+    def append(self, day, entry, **fields):
+        """Append an entry to the journal of the day
+
+        :param day: date
+        :param entry: string, type of the entry, eg: ShiftJournal.ADDED
+        :param fields: extra fields of the entry
+        """
+        line = DEFAULT_CODEC.dumps(dict(fields, entry=entry))
+        with self.lock:
+            if not os.path.exists(self.folder):
+                os.makedirs(self.folder, exist_ok=True)
+            with open(self.get_path(day), 'a') as file:
+                file.write(line + '\n')
+                file.flush()
+                os.fsync(file.fileno())
+
+    def plan(self, day, periods):
+        """Start the journal of the day with the worked periods to save, discarding the previous one
+
+        :param day: date
+        :param periods: list of periods, dict(start_hour, start_minute, end_hour, end_minute)
+        """
+        self.append(day, self.PLANNED, periods=periods)
+
+    def added(self, day, index):
+        """The worked period at position index of the plan has been processed
+
+        :param day: date
+        :param index: int
+        """
+        self.append(day, self.ADDED, index=index)
+
+    def deleting(self, day, shift_ids):
+        """Shifts that are going to be deleted to resave the day
+
+        :param day: date
+        :param shift_ids: list of int
+        """
+        self.append(day, self.DELETING, shift_ids=shift_ids)
+
+    def deleted(self, day, shift_id):
+        """Shift deleted
+
+        :param day: date
+        :param shift_id: int
+        """
+        self.append(day, self.DELETED, shift_id=shift_id)
+
+    def finish(self, day):
+        """All the worked periods of the day have been processed
+
+        :param day: date
+        """
+        self.append(day, self.FINISHED)
+
+    def load(self, day):
+        """Replay the journal of the day
+
+        A truncated last line (the process died while writing it) is ignored.
+        :param day: date
+        :return: dict with the keys
+            - periods: list of periods planned, None if there is no plan
+            - added: set of int, index of the periods processed
+            - deleting: set of int, shift ids pending to delete
+            - finished: bool
+        """
+        state = {
+            'periods': None,
+            'added': set(),
+            'deleting': set(),
+            'finished': False
+        }
+        path = self.get_path(day)
+        if not os.path.exists(path):
+            return state
+
+        with self.lock, open(path, 'r') as file:
+            for line in file:
+                try:
+                    entry = DEFAULT_CODEC.loads(line)
+                except ValueError:
+                    LOGGER.warning('Ignoring corrupted journal entry on %s', path)
+                    continue
+                entry_type = entry.get('entry')
+                if entry_type == self.PLANNED:
+                    # A new plan discards the previous progress, eg: resave the day
+                    state['periods'] = entry.get('periods')
+                    state['added'] = set()
+                    state['finished'] = False
+                elif entry_type == self.ADDED:
+                    state['added'].add(entry.get('index'))
+                elif entry_type == self.DELETING:
+                    state['deleting'].update(entry.get('shift_ids', []))
+                elif entry_type == self.DELETED:
+                    state['deleting'].discard(entry.get('shift_id'))
+                elif entry_type == self.FINISHED:
+                    state['finished'] = True
+        return state
@@ -0,0 +1,77 @@
+import codecs
+import json
+
+# Bytes read from the response each time
+CHUNK_SIZE = 64 * 1024
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+# Characters that can follow a complete number inside an array
+_NUMBER_END = _WHITESPACE + ',]'
+
+
+def iter_json_array(chunks):
+    """Decode a json array incrementally, without keeping the whole document or array in memory
+
+    :param chunks: iterable of bytes, eg: response.iter_content(CHUNK_SIZE)
+    :return: generator of the items of the array
+    """
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    buffer = ''
+    position = 0
+    eof = False
+
+    def read_more():
+        nonlocal buffer, position, eof
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+            buffer = buffer[position:] + text_decoder.decode(b'', final=True)
+        else:
+            buffer = buffer[position:] + text_decoder.decode(chunk)
+        position = 0
+
+    def skip_whitespace():
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position < len(buffer) or eof:
+                return
+            read_more()
+
+    skip_whitespace()
+    if position >= len(buffer) or buffer[position] != '[':
+        raise ValueError('Expected a json array')
+    position += 1
+    skip_whitespace()
+    if position < len(buffer) and buffer[position] == ']':
+        return
+
+    while True:
+        skip_whitespace()
+        try:
+            item, end = _DECODER.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            read_more()
+            continue
+        if not eof and (end >= len(buffer) or (
+                isinstance(item, (int, float)) and buffer[end] not in _NUMBER_END)):
+            # A number could continue on the next chunk, eg: [12. + 75]
+            read_more()
+            continue
+        position = end
+        yield item
+
+        skip_whitespace()
+        if position >= len(buffer):
+            raise ValueError('Unterminated json array')
+        separator = buffer[position]
+        position += 1
+        if separator == ']':
+            return
+        if separator != ',':
+            raise ValueError(f'Unexpected {separator!r} on json array')
@@ -0,0 +1,71 @@
+import atexit
+import json
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+class JsonFormatter(logging.Formatter):
+
+    def format(self, record):
+        """Format the record as a json line with the account of the client
+
+        :param record: LogRecord
+        :return: string
+        """
+        log = {
+            'time': self.formatTime(record),
+            'logger': record.name,
+            'level': record.levelname,
+            'account': getattr(record, 'account', None),
+            'message': record.getMessage()
+        }
+        if record.exc_info:
+            log['exception'] = self.formatException(record.exc_info)
+        return json.dumps(log)
+
+
+class DeferredQueueHandler(QueueHandler):
+
+    def prepare(self, record):
+        """Put the record on the queue without formatting it, the listener thread formats it
+
+        The arguments of the message must not be modified after logging them.
+        :param record: LogRecord
+        :return: LogRecord
+        """
+        return record
+
+
+def start_queue_logging(logger_name='factorial.client', structured=False):
+    """Move the handlers of the logger to a background thread, so logging doesn't wait for the file or console
+
+    The records are put on a queue and formatted and written by a listener thread, that is stopped at exit.
+    :param logger_name: (optional) string, logger configured on constants.LOGGING_CONFIG
+    :param structured: (optional) bool, write each record as a json line with the account of the client
+    :return: QueueListener
+    """
+    logger = logging.getLogger(logger_name)
+    handlers = [handler for handler in logger.handlers if not isinstance(handler, QueueHandler)]
+    if structured:
+        for handler in handlers:
+            handler.setFormatter(JsonFormatter())
+
+    records = queue.SimpleQueue()
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(DeferredQueueHandler(records))
+
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+def stop_queue_logging(listener):
+    """Write the pending records and stop the listener thread before the exit
+
+    :param listener: QueueListener returned by start_queue_logging
+    """
+    atexit.unregister(listener.stop)
+    listener.stop()
@@ -0,0 +1,84 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import EmptyPoolError
+
+
+class TimeoutPoolMixin:
+    # Seconds to wait for a free connection of the pool, None waits forever
+    pool_timeout = None
+
+    def urlopen(self, *args, **kwargs):
+        """requests doesn't pass the pool timeout, wait for a free connection only as long as the pool timeout"""
+        kwargs.setdefault('pool_timeout', self.pool_timeout)
+        return super().urlopen(*args, **kwargs)
+
+
+class SharedHTTPAdapter(HTTPAdapter):
+
+    def __init__(self, pool_timeout=None, **kwargs):
+        """Adapter shared by many sessions
+
+        :param pool_timeout: (optional) float, seconds to wait for a free connection when all are in use
+        :param kwargs: arguments of HTTPAdapter, eg: pool_maxsize
+        """
+        super().__init__(**kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': type('TimeoutHTTPConnectionPool', (TimeoutPoolMixin, HTTPConnectionPool),
+                         {'pool_timeout': pool_timeout}),
+            'https': type('TimeoutHTTPSConnectionPool', (TimeoutPoolMixin, HTTPSConnectionPool),
+                          {'pool_timeout': pool_timeout})
+        }
+
+    def send(self, request, **kwargs):
+        """Send the request, failing as a connection error if no connection is free after the pool timeout
+
+        :return: requests.Response
+        """
+        try:
+            return super().send(request, **kwargs)
+        except EmptyPoolError as err:
+            raise requests.exceptions.ConnectionError(err, request=request)
+
+    def close(self):
+        """Closing a session doesn't close the connections shared with the other sessions"""
+        pass
+
+    def close_connections(self):
+        """Close all the connections of the pool"""
+        super().close()
+
+
+class ConnectionPool:
+    # Max connections open at the same time to the api
+    DEFAULT_MAX_CONNECTIONS = 16
+    # Seconds to wait for a free connection, so a connection never returned can't block all the clients
+    DEFAULT_POOL_TIMEOUT = 60
+
+    def __init__(self, max_connections=DEFAULT_MAX_CONNECTIONS, pool_timeout=DEFAULT_POOL_TIMEOUT):
+        """Connections to the api shared by many clients, each client keeps its own session with its cookies
+
+        When all the connections are in use, the requests wait for a free one instead of opening more.
+        :param max_connections: (optional) int, max connections open at the same time to each host
+        :param pool_timeout: (optional) float, seconds to wait for a free connection before failing
+            with requests.exceptions.ConnectionError
+        """
+        self.adapter = SharedHTTPAdapter(pool_timeout=pool_timeout, pool_maxsize=max_connections, pool_block=True)
+
+    def new_session(self):
+        """New session, with its own cookies, that sends the requests through the shared connections
+
+        :return: requests.Session
+        """
+        session = requests.Session()
+        session.mount('https://', self.adapter)
+        session.mount('http://', self.adapter)
+        return session
+
+    def close(self):
+        """Close all the connections"""
+        self.adapter.close_connections()
+
+
+# Connections shared by all the clients of the process
+SHARED_CONNECTION_POOL = ConnectionPool()
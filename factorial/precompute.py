@@ -0,0 +1,132 @@
+import gzip
+import logging
+import os
+import time
+
+from constants import BASE_PROJECT
+from factorial.codec import DEFAULT_CODEC
+
+LOGGER = logging.getLogger('factorial.client')
+
+
+class PrecomputeStore:
+    # Folder to save the precomputed months, one sub folder for each account
+    PRECOMPUTE_FOLDER = os.path.join(BASE_PROJECT, "precompute")
+    # Seconds that a precomputed month is valid, after that it's revalidated before using it
+    MAX_AGE = 36 * 60 * 60
+
+    def __init__(self, account, folder=None, max_age=MAX_AGE):
+        """Months precomputed ahead, with everything needed to sign a day without reading from the api
+
+        Each month is saved on a gzip json file with:
+            - year, month: int
+            - employee_id: int, employee of the month
+            - period_id: int
+            - laborable_days: list of int
+            - leave_days: list of int
+            - signed_days: list of int, days with shifts when it was precomputed
+            - work: string, work settings used to generate the schedules
+            - schedules: dict day: list of [start_hour, start_minute, end_hour, end_minute]
+            - created: float timestamp
+        :param account: (required) string, unique name of the account, eg: the cookie file
+        :param folder: (optional) string, folder to save the months
+        :param max_age: (optional) int, seconds that a precomputed month is valid
+        """
+        self.folder = os.path.join(folder or self.PRECOMPUTE_FOLDER, account)
+        self.max_age = max_age
+
+    def get_path(self, year, month):
+        """Path of a precomputed month
+
+        :param year: int
+        :param month: int
+        :return: string
+        """
+        return os.path.join(self.folder, f'{year:04d}-{month:02d}.json.gz')
+
+    def save(self, month_plan):
+        """Save a precomputed month, replacing the previous one
+
+        :param month_plan: dict, see the class
+        """
+        if not os.path.exists(self.folder):
+            os.makedirs(self.folder, exist_ok=True)
+        path = self.get_path(month_plan['year'], month_plan['month'])
+        # Write on a temporary file and rename it, to never read a half written month
+        temporary_path = f'{path}.tmp'
+        with gzip.open(temporary_path, 'wt', encoding='utf-8') as file:
+            file.write(DEFAULT_CODEC.dumps(month_plan))
+        os.replace(temporary_path, path)
+
+    def load(self, year, month):
+        """Load a precomputed month
+
+        :param year: int
+        :param month: int
+        :return: dict, see the class, None if it isn't precomputed
+        """
+        path = self.get_path(year, month)
+        if not os.path.exists(path):
+            return None
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as file:
+                return DEFAULT_CODEC.loads(file.read())
+        except (OSError, ValueError):
+            LOGGER.warning('Ignoring corrupted precomputed month %s', path)
+            return None
+
+    def is_stale(self, month_plan):
+        """Check if a precomputed month is too old to trust it
+
+        :param month_plan: dict
+        :return: bool
+        """
+        return time.time() - month_plan.get('created', 0) > self.max_age
+
+    def remove(self, year, month):
+        """Remove a precomputed month, eg: because the api rejected its data
+
+        :param year: int
+        :param month: int
+        """
+        path = self.get_path(year, month)
+        if os.path.exists(path):
+            os.remove(path)
+
+    @staticmethod
+    def get_work_fingerprint(work_loader):
+        """Summary of the work settings, to know if the schedules were generated with other settings
+
+        :param work_loader: AbstractWork
+        :return: string
+        """
+        return DEFAULT_CODEC.dumps([
+            work_loader.get_start_hour(),
+            work_loader.get_end_hour(),
+            work_loader.get_minutes_variation(),
+            [repr(work_break) for work_break in work_loader.get_breaks()]
+        ])
+
+    @staticmethod
+    def pack_periods(worked_periods):
+        """Compact worked periods to save them
+
+        :param worked_periods: list of dict(start_hour, start_minute, end_hour, end_minute)
+        :return: list of [start_hour, start_minute, end_hour, end_minute]
+        """
+        return [
+            [period['start_hour'], period['start_minute'], period['end_hour'], period['end_minute']]
+            for period in worked_periods
+        ]
+
+    @staticmethod
+    def unpack_periods(packed_periods):
+        """Worked periods from the compact ones
+
+        :param packed_periods: list of [start_hour, start_minute, end_hour, end_minute]
+        :return: list of dict(start_hour, start_minute, end_hour, end_minute)
+        """
+        return [
+            {'start_hour': start_hour, 'start_minute': start_minute, 'end_hour': end_hour, 'end_minute': end_minute}
+            for start_hour, start_minute, end_hour, end_minute in packed_periods
+        ]
@@ -0,0 +1,103 @@
+import contextlib
+import cProfile
+import json
+import pstats
+import threading
+import time
+
+
+class Profiler:
+
+    def __init__(self, enabled=True, cprofile=False):
+        """Time the phases of a run, eg: login, get_period, post_shift
+
+        The phases can be nested, eg: get_shift includes the time of its get_period, and a phase
+        done several times accumulates all of them.
+        :param enabled: (optional) bool, when disabled the phases are not timed
+        :param cprofile: (optional) bool, also capture the cProfile stats between start and stop
+        """
+        self.enabled = enabled
+        self.cprofile = cProfile.Profile() if enabled and cprofile else None
+        self.lock = threading.Lock()
+        self.phases = {}
+        self.started = None
+        self.stopped = None
+
+    def start(self):
+        """Start the run"""
+        if not self.enabled:
+            return
+        self.started = time.perf_counter()
+        if self.cprofile:
+            self.cprofile.enable()
+
+    def stop(self):
+        """Stop the run"""
+        if not self.enabled:
+            return
+        if self.cprofile:
+            self.cprofile.disable()
+        self.stopped = time.perf_counter()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Time a phase
+
+        :param name: string, eg: 'get_period'
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                phase = self.phases.setdefault(name, {'calls': 0, 'total': 0.0, 'max': 0.0})
+                phase['calls'] += 1
+                phase['total'] += elapsed
+                phase['max'] = max(phase['max'], elapsed)
+
+    def summary(self):
+        """Timing summary of the run, in seconds
+
+        Example:
+        {
+            "total": 1.2034,
+            "phases": {
+                "get_period": {"calls": 2, "total": 0.4012, "max": 0.2103},
+                ...
+            }
+        }
+        :return: dict
+        """
+        total = None
+        if self.started is not None:
+            total = round((self.stopped or time.perf_counter()) - self.started, 4)
+        with self.lock:
+            phases = {
+                name: {'calls': phase['calls'], 'total': round(phase['total'], 4), 'max': round(phase['max'], 4)}
+                for name, phase in sorted(self.phases.items(), key=lambda item: item[1]['total'], reverse=True)
+            }
+        return {'total': total, 'phases': phases}
+
+    def dump_summary(self, filename=None):
+        """Timing summary as json
+
+        :param filename: (optional) string, file to save the summary
+        :return: string json
+        """
+        summary = json.dumps(self.summary(), indent=2)
+        if filename:
+            with open(filename, 'w') as file:
+                file.write(summary)
+        return summary
+
+    def dump_stats(self, filename):
+        """Save the cProfile stats, to be read with pstats or snakeviz
+
+        :param filename: string
+        """
+        if self.cprofile:
+            pstats.Stats(self.cprofile).dump_stats(filename)
@@ -0,0 +1,232 @@
+import json
+import logging
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on windows, the limits can only be shared between threads
+    fcntl = None
+
+LOGGER = logging.getLogger('factorial.client')
+
+
+class TokenBucket:
+
+    def __init__(self, rate, capacity):
+        """Token bucket shared between threads
+
+        :param rate: float, tokens added each second
+        :param capacity: int, max tokens saved, the max burst of requests
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.state = self.new_state()
+
+    def new_state(self):
+        """State of a full bucket
+
+        :return: dict(tokens, updated, blocked_until)
+        """
+        return {
+            'tokens': self.capacity,
+            'updated': time.time(),
+            'blocked_until': 0
+        }
+
+    def take(self, state, now):
+        """Take a token from the state, the tokens can be negative to reserve the next ones
+
+        :param state: dict(tokens, updated, blocked_until)
+        :param now: float, timestamp
+        :return: float, seconds to wait before using the token
+        """
+        # During a pause the updated time is in the future, the tokens only accrue from then on, so the
+        # requests queued meanwhile are released at the rate when the pause ends instead of all at once
+        updated = max(state['updated'], now)
+        elapsed = updated - state['updated']
+        state['tokens'] = min(self.capacity, state['tokens'] + elapsed * self.rate) - 1
+        state['updated'] = updated
+        wait_tokens = -state['tokens'] / self.rate if state['tokens'] < 0 else 0
+        return max(updated - now + wait_tokens, state['blocked_until'] - now)
+
+    def block(self, state, now, seconds):
+        """Don't give tokens until the seconds have passed, and start again with an empty bucket
+
+        :param state: dict(tokens, updated, blocked_until)
+        :param now: float, timestamp
+        :param seconds: float
+        """
+        state['blocked_until'] = max(state['blocked_until'], now + seconds)
+        state['tokens'] = 0
+        state['updated'] = state['blocked_until']
+
+    def acquire(self):
+        """Wait until a token is available
+
+        :return: float, seconds waited
+        """
+        with self.lock:
+            wait = self.take(self.state, time.time())
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds):
+        """Stop giving tokens for a while, eg: the api asked to retry after some seconds
+
+        :param seconds: float
+        """
+        with self.lock:
+            self.block(self.state, time.time(), seconds)
+
+
+class FileTokenBucket(TokenBucket):
+
+    def __init__(self, rate, capacity, filename):
+        """Token bucket shared between processes, the state is saved on a locked file
+
+        :param rate: float, tokens added each second
+        :param capacity: int, max tokens saved, the max burst of requests
+        :param filename: string, file to save the state of the bucket
+        """
+        if fcntl is None:
+            raise RuntimeError('Rate limits shared between processes are not supported on this platform')
+        super().__init__(rate, capacity)
+        self.filename = filename
+
+    def update_state(self, update):
+        """Load the state from the file, update it and save it, locking the file meanwhile
+
+        :param update: function(state, now) that modifies the state
+        :return: the value returned by update
+        """
+        with self.lock, open(self.filename, 'a+') as file:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            try:
+                file.seek(0)
+                try:
+                    state = json.loads(file.read())
+                except ValueError:
+                    state = self.new_state()
+                result = update(state, time.time())
+                file.seek(0)
+                file.truncate()
+                file.write(json.dumps(state))
+                file.flush()
+                return result
+            finally:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+    def acquire(self):
+        """Wait until a token is available
+
+        :return: float, seconds waited
+        """
+        wait = self.update_state(self.take)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds):
+        """Stop giving tokens for a while, eg: the api asked to retry after some seconds
+
+        :param seconds: float
+        """
+        self.update_state(lambda state, now: self.block(state, now, seconds))
+
+
+class RateLimiter:
+    # Endpoint classes
+    # Login and logout
+    AUTH = 'auth'
+    # Get info
+    READ = 'read'
+    # Create, modify or delete info
+    WRITE = 'write'
+
+    # Default limits for each endpoint class, tuple(tokens each second, max burst)
+    DEFAULT_LIMITS = {
+        AUTH: (0.5, 2),
+        READ: (10, 20),
+        WRITE: (5, 10)
+    }
+
+    # Seconds to wait when the api doesn't say how long to wait
+    DEFAULT_RETRY_AFTER = 5
+
+    def __init__(self, limits=None, state_folder=None):
+        """Rate limit the requests to the api for each endpoint class
+
+        :param limits: (optional) dict, endpoint class: tuple(tokens each second, max burst),
+            overwrites the DEFAULT_LIMITS
+        :param state_folder: (optional) string, folder to share the limits with other processes,
+            by default the limits are only shared between the threads of the process
+        """
+        self.limits = dict(self.DEFAULT_LIMITS, **(limits or {}))
+        self.state_folder = state_folder
+        if state_folder and not os.path.exists(state_folder):
+            os.makedirs(state_folder, exist_ok=True)
+        self.buckets = {
+            endpoint_class: self.create_bucket(endpoint_class, rate, capacity)
+            for endpoint_class, (rate, capacity) in self.limits.items()
+        }
+
+    def create_bucket(self, endpoint_class, rate, capacity):
+        """Create the bucket of an endpoint class
+
+        :param endpoint_class: string, eg: RateLimiter.READ
+        :param rate: float, tokens added each second
+        :param capacity: int, max burst
+        :return: TokenBucket
+        """
+        if self.state_folder:
+            return FileTokenBucket(rate, capacity, os.path.join(self.state_folder, f'{endpoint_class}.bucket'))
+        return TokenBucket(rate, capacity)
+
+    def acquire(self, endpoint_class):
+        """Wait until a request of the endpoint class can be done
+
+        :param endpoint_class: string, eg: RateLimiter.READ
+        """
+        waited = self.buckets[endpoint_class].acquire()
+        if waited > 0:
+            LOGGER.debug('Rate limited %s request, waited %.2fs', endpoint_class, waited)
+
+    def backoff(self, endpoint_class, retry_after=None):
+        """The api answered too many requests, stop the requests of that endpoint class
+
+        :param endpoint_class: string, eg: RateLimiter.READ
+        :param retry_after: (optional) string, value of the Retry-After header
+        :return: float, seconds paused
+        """
+        seconds = self.parse_retry_after(retry_after)
+        LOGGER.warning('Too many %s requests, pausing them %.2fs', endpoint_class, seconds)
+        self.buckets[endpoint_class].pause(seconds)
+        return seconds
+
+    @staticmethod
+    def parse_retry_after(retry_after):
+        """Seconds to wait from a Retry-After header, that can be seconds or an http date
+
+        :param retry_after: string or None
+        :return: float
+        """
+        if not retry_after:
+            return RateLimiter.DEFAULT_RETRY_AFTER
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return RateLimiter.DEFAULT_RETRY_AFTER
+
+
+# Rate limiter shared by all the clients of the process
+SHARED_RATE_LIMITER = RateLimiter()
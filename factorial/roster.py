@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from contextlib import contextmanager
+
+
+class RosterView(Sequence):
+
+    def __init__(self, roster, access_id):
+        """Employees of a roster without one of them, eg: the mates of the current user
+
+        :param roster: tuple of Employee, shared by all the clients of the company
+        :param access_id: int, access id of the employee to exclude
+        """
+        self.roster = roster
+        self.excluded = next(
+            (position for position, employee in enumerate(roster) if employee.access_id == access_id),
+            len(roster)
+        )
+
+    def __len__(self):
+        return len(self.roster) - (1 if self.excluded < len(self.roster) else 0)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('roster index out of range')
+        return self.roster[index + 1 if index >= self.excluded else index]
+
+    def __iter__(self):
+        for position, employee in enumerate(self.roster):
+            if position != self.excluded:
+                yield employee
+
+
+class RosterCache:
+    # Seconds to keep a roster
+    DEFAULT_TTL = 15 * 60
+    # Max companies saved, the least used are evicted
+    DEFAULT_MAX_COMPANIES = 128
+
+    def __init__(self, ttl=DEFAULT_TTL, max_companies=DEFAULT_MAX_COMPANIES):
+        """Employees of each company, shared by all the clients of the process
+
+        :param ttl: (optional) int seconds to keep a roster, 0 to disable the cache
+        :param max_companies: (optional) int, max companies saved
+        """
+        self.ttl = ttl
+        self.max_companies = max_companies
+        self.lock = threading.Lock()
+        # key: tuple(expiration, roster)
+        self.rosters = OrderedDict()
+        # company id: [lock to load the roster only once at the same time, clients using it], only while loading
+        self.loading_locks = {}
+
+    @staticmethod
+    def get_key(company_id, employee_fields=()):
+        """Key of a roster, the rosters with different extra fields are saved apart
+
+        :param company_id: int
+        :param employee_fields: iterable of string
+        :return: tuple
+        """
+        return company_id, tuple(sorted(employee_fields))
+
+    def get(self, company_id, employee_fields=()):
+        """Get the roster of a company if it's saved and not expired
+
+        :param company_id: int
+        :param employee_fields: (optional) iterable of string, extra fields of the employees
+        :return: tuple of Employee or None
+        """
+        key = self.get_key(company_id, employee_fields)
+        with self.lock:
+            saved = self.rosters.get(key)
+            if saved is None:
+                return None
+            expiration, roster = saved
+            if expiration <= time.monotonic():
+                del self.rosters[key]
+                return None
+            self.rosters.move_to_end(key)
+            return roster
+
+    def put(self, company_id, roster, employee_fields=()):
+        """Save the roster of a company
+
+        :param company_id: int
+        :param roster: iterable of Employee, they must not be modified after saving them
+        :param employee_fields: (optional) iterable of string, extra fields of the employees
+        :return: tuple of Employee saved
+        """
+        roster = tuple(roster)
+        if self.ttl <= 0:
+            return roster
+        key = self.get_key(company_id, employee_fields)
+        with self.lock:
+            self.rosters[key] = (time.monotonic() + self.ttl, roster)
+            self.rosters.move_to_end(key)
+            while len(self.rosters) > self.max_companies:
+                self.rosters.popitem(last=False)
+        return roster
+
+    def invalidate(self, company_id=None):
+        """Remove the roster of a company, or all of them
+
+        :param company_id: (optional) int
+        """
+        with self.lock:
+            if company_id is None:
+                self.rosters.clear()
+                return
+            for key in [key for key in self.rosters if key[0] == company_id]:
+                del self.rosters[key]
+
+    @contextmanager
+    def loading(self, company_id):
+        """Lock to load the roster of a company, so the clients of the same company wait for the first one
+        instead of downloading the same roster, the lock is removed when no client is using it
+
+        :param company_id: int
+        """
+        with self.lock:
+            loading_lock = self.loading_locks.setdefault(company_id, [threading.Lock(), 0])
+            loading_lock[1] += 1
+        try:
+            with loading_lock[0]:
+                yield
+        finally:
+            with self.lock:
+                loading_lock[1] -= 1
+                if not loading_lock[1]:
+                    del self.loading_locks[company_id]
+
+
+# Roster cache shared by all the clients of the process
+SHARED_ROSTER_CACHE = RosterCache()
@@ -0,0 +1,183 @@
+import base64
+import collections
+import gzip
+import hashlib
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from factorial.codec import DEFAULT_CODEC
+from factorial.exceptions import InteractionNotRecorded
+
+# Headers that are not saved on the cassettes, the body is saved already decoded
+IGNORED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'set-cookie', 'connection'}
+
+
+class Transport:
+
+    def send(self, session, method, url, **kwargs):
+        """Send a request to the api
+
+        :param session: requests.Session of the client, with its cookies
+        :param method: string, http method eg: 'get'
+        :param url: string
+        :param kwargs: extra arguments for the request, eg: params, data
+        :return: requests.Response
+        """
+        raise NotImplementedError()
+
+    @staticmethod
+    def get_request_key(request):
+        """Key to identify a request on a cassette
+
+        The body is hashed to don't save the credentials of the login on the cassette
+        :param request: requests.PreparedRequest
+        :return: tuple(method, url, body hash)
+        """
+        body = request.body or b''
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        return request.method.upper(), request.url, hashlib.sha256(body).hexdigest()
+
+    @staticmethod
+    def prepare_request(session, method, url, **kwargs):
+        """Request as the client sends it, before any redirect
+
+        :param session: requests.Session of the client
+        :param method: string, http method eg: 'get'
+        :param url: string
+        :param kwargs: extra arguments for the request, eg: params, data
+        :return: requests.PreparedRequest
+        """
+        return session.prepare_request(requests.Request(
+            method=method.upper(),
+            url=url,
+            params=kwargs.get('params'),
+            data=kwargs.get('data')
+        ))
+
+
+class RequestsTransport(Transport):
+
+    def send(self, session, method, url, **kwargs):
+        """Send the request with the session of the client
+
+        :return: requests.Response
+        """
+        return session.request(method, url, **kwargs)
+
+
+class RecordingTransport(Transport):
+
+    def __init__(self, cassette, transport=None):
+        """Send the requests and record them with their responses on a cassette, to replay them later
+
+        The cassette is a gzip file with one json interaction per line, each interaction is appended as soon as
+        the response is received.
+        :param cassette: (required) string, file of the cassette
+        :param transport: (optional) Transport to send the requests, by default RequestsTransport
+        """
+        self.cassette = cassette
+        self.transport = transport or RequestsTransport()
+        self.lock = threading.Lock()
+
+    def send(self, session, method, url, **kwargs):
+        """Send the request and record it
+
+        :return: requests.Response
+        """
+        # The key of the request sent, response.request is the last one after the redirects, eg: the login
+        request_method, request_url, body_hash = self.get_request_key(
+            self.prepare_request(session, method, url, **kwargs)
+        )
+        start = time.perf_counter()
+        response = self.transport.send(session, method, url, **kwargs)
+        elapsed = time.perf_counter() - start
+        interaction = {
+            'method': request_method,
+            'url': request_url,
+            'body_hash': body_hash,
+            'status': response.status_code,
+            'headers': {
+                header: value
+                for header, value in response.headers.items()
+                if header.lower() not in IGNORED_HEADERS
+            },
+            'elapsed': round(elapsed, 4)
+        }
+        try:
+            interaction['body'] = response.content.decode('utf-8')
+        except UnicodeDecodeError:
+            interaction['body'] = base64.b64encode(response.content).decode('ascii')
+            interaction['base64'] = True
+
+        line = DEFAULT_CODEC.dumps(interaction) + '\n'
+        with self.lock, gzip.open(self.cassette, 'at', encoding='utf-8') as file:
+            file.write(line)
+        return response
+
+
+class ReplayTransport(Transport):
+    # Wait the same time that took the recorded response
+    RECORDED_LATENCY = 'recorded'
+
+    def __init__(self, cassette, latency=None):
+        """Answer the requests with the responses of a cassette, without connecting to the api
+
+        The same request recorded several times is answered with its responses in the recorded order,
+        repeating the last one when all of them have been used.
+        :param cassette: (required) string, file of the cassette recorded with RecordingTransport
+        :param latency: (optional) float seconds to wait before each response, or RECORDED_LATENCY
+            to wait as long as the recorded response, by default don't wait
+        """
+        self.cassette = cassette
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.interactions = collections.defaultdict(collections.deque)
+        with gzip.open(cassette, 'rt', encoding='utf-8') as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                interaction = DEFAULT_CODEC.loads(line)
+                key = interaction['method'], interaction['url'], interaction['body_hash']
+                self.interactions[key].append(interaction)
+
+    def send(self, session, method, url, **kwargs):
+        """Answer the request with the recorded response
+
+        :return: requests.Response
+        """
+        request = self.prepare_request(session, method, url, **kwargs)
+        key = self.get_request_key(request)
+        with self.lock:
+            responses = self.interactions.get(key)
+            if not responses:
+                raise InteractionNotRecorded(*key[:2])
+            interaction = responses.popleft() if len(responses) > 1 else responses[0]
+
+        latency = interaction.get('elapsed', 0) if self.latency == self.RECORDED_LATENCY else self.latency
+        if latency:
+            time.sleep(latency)
+        return self.build_response(request, interaction)
+
+    @staticmethod
+    def build_response(request, interaction):
+        """Build the response of a recorded interaction
+
+        :param request: requests.PreparedRequest
+        :param interaction: dict
+        :return: requests.Response
+        """
+        body = interaction.get('body', '')
+        content = base64.b64decode(body) if interaction.get('base64') else body.encode('utf-8')
+        response = requests.Response()
+        response.status_code = interaction['status']
+        response.headers = CaseInsensitiveDict(interaction.get('headers', {}))
+        response.url = request.url
+        response.request = request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers) or 'utf-8'
+        response._content = content
+        response._content_consumed = True
+        return response
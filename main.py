@@ -1,15 +1,69 @@
+import argparse
+from datetime import date, datetime
+
 from factorial.exceptions import AuthenticationTokenNotFound, ApiError, UserNotLoggedIn
 from factorial.factorialclient import FactorialClient
 from factorial.loader import JsonCredentials, JsonWork
+from factorial.logging_queue import start_queue_logging
+from factorial.profiling import Profiler
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Sign the worked day on factorialhr')
+    parser.add_argument('--settings', nargs='+', default=['factorial_settings.json'],
+                        help='Settings files, one for each account')
+    parser.add_argument('--precompute', action='store_true',
+                        help='Instead of signing today, precompute the next month to sign its days faster')
+    parser.add_argument('--month', type=lambda month: datetime.strptime(month, '%Y-%m').date(),
+                        help='Month to precompute, YYYY-MM, by default the next month')
+    parser.add_argument('--profile', action='store_true', help='Time each phase of the run and print a summary')
+    parser.add_argument('--profile-output', help='File to save the json timing summary instead of printing it, '
+                                                 'implies --profile')
+    parser.add_argument('--cprofile', help='File to save the cProfile stats of the run, implies --profile')
+    parser.add_argument('--log-queue', action='store_true',
+                        help='Write the logs from a background thread, without blocking the requests')
+    parser.add_argument('--log-json', action='store_true', help='Write the logs as json lines, implies --log-queue')
+    return parser.parse_args()
+
+
+def get_next_month(day):
+    """First day of the month after the day
+
+    :param day: date
+    :return: date
+    """
+    if day.month == 12:
+        return date(day.year + 1, 1, 1)
+    return date(day.year, day.month + 1, 1)
+
 
 if __name__ == '__main__':
-    settings_file = 'factorial_settings.json'
+    args = parse_args()
+    if args.log_queue or args.log_json:
+        start_queue_logging(structured=args.log_json)
+    profiler = Profiler(enabled=args.profile or bool(args.profile_output or args.cprofile),
+                        cprofile=bool(args.cprofile))
+    profiler.start()
     try:
-        client = FactorialClient.load_from_settings(JsonCredentials(settings_file))
-        client.worked_day(JsonWork(settings_file))
-    except AuthenticationTokenNotFound as err:
-        print(f"Can't retrieve the login token: {err}")
-    except UserNotLoggedIn as err:
-        print(f'User not logged in: {err}')
-    except ApiError as err:
-        print(f"Api error: {err}")
+        for settings_file in args.settings:
+            try:
+                client = FactorialClient.load_from_settings(JsonCredentials(settings_file), profiler=profiler)
+                if args.precompute:
+                    month = args.month or get_next_month(date.today())
+                    client.precompute_month(JsonWork(settings_file), month.year, month.month)
+                else:
+                    client.worked_day(JsonWork(settings_file))
+            except AuthenticationTokenNotFound as err:
+                print(f"Can't retrieve the login token: {err}")
+            except UserNotLoggedIn as err:
+                print(f'User not logged in: {err}')
+            except ApiError as err:
+                print(f"Api error: {err}")
+    finally:
+        profiler.stop()
+        if profiler.enabled:
+            summary = profiler.dump_summary(args.profile_output)
+            if not args.profile_output:
+                print(summary)
+        if args.cprofile:
+            profiler.dump_stats(args.cprofile)
@@ -0,0 +1,26 @@
+import gzip
+import unittest
+import zlib
+
+from factorial.codec import decompress_chunks
+
+BODY = b'[1, 2, {"name": "Jos\xc3\xa9"}]'
+
+
+class DecompressChunksTest(unittest.TestCase):
+
+    def test_every_chunk_size(self):
+        for name, data in (('plain', BODY), ('gzip', gzip.compress(BODY)), ('deflate', zlib.compress(BODY))):
+            for chunk_size in range(1, len(data) + 1):
+                chunks = [data[start:start + chunk_size] for start in range(0, len(data), chunk_size)]
+                with self.subTest(encoding=name, chunk_size=chunk_size):
+                    self.assertEqual(b''.join(decompress_chunks(chunks)), BODY)
+
+    def test_short_bodies(self):
+        for data in (b'', b'1'):
+            with self.subTest(data=data):
+                self.assertEqual(b''.join(decompress_chunks([data])), data)
+
+
+if __name__ == '__main__':
+    unittest.main()
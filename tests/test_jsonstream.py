@@ -0,0 +1,34 @@
+import json
+import unittest
+
+from factorial.jsonstream import iter_json_array
+
+PAYLOADS = [
+    '[]',
+    ' [ ] ',
+    '[12.75]',
+    '[1e5, -2.5E-3, 0, -0.0, 123456789012345678901234567890]',
+    '[true, false, null, 1.5]',
+    '[{"id": 1, "name": "José", "values": [1, 2.5, {"a": null}]}, "text, with ] and [", 3]',
+    '\n[\n  {"first_name": "Ángela", "hours": 7.5},\n  {"first_name": "测试", "hours": 1e1}\n]\n',
+]
+
+
+class IterJsonArrayTest(unittest.TestCase):
+
+    def test_every_chunk_size(self):
+        for payload in PAYLOADS:
+            data = payload.encode('utf-8')
+            for chunk_size in range(1, len(data) + 1):
+                chunks = [data[start:start + chunk_size] for start in range(0, len(data), chunk_size)]
+                with self.subTest(payload=payload, chunk_size=chunk_size):
+                    self.assertEqual(list(iter_json_array(chunks)), json.loads(payload))
+
+    def test_invalid(self):
+        for payload in ('{"a": 1}', '[1, 2', '[1 2]', '[12x]'):
+            with self.subTest(payload=payload), self.assertRaises(ValueError):
+                list(iter_json_array([payload.encode('utf-8')]))
+
+
+if __name__ == '__main__':
+    unittest.main()
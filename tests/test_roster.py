@@ -0,0 +1,47 @@
+import threading
+import unittest
+
+from factorial.roster import RosterCache
+
+
+class RosterCacheTest(unittest.TestCase):
+
+    def test_evicts_the_least_used(self):
+        cache = RosterCache(max_companies=2)
+        cache.put(1, ['a'])
+        cache.put(2, ['b'])
+        cache.get(1)
+        cache.put(3, ['c'])
+        self.assertEqual(cache.get(1), ('a',))
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(cache.get(3), ('c',))
+
+    def test_loading_locks_are_removed(self):
+        cache = RosterCache()
+        for company_id in range(100):
+            with cache.loading(company_id):
+                self.assertIn(company_id, cache.loading_locks)
+        self.assertEqual(cache.loading_locks, {})
+
+    def test_loading_waits_for_the_first_client(self):
+        cache = RosterCache()
+        loaded = threading.Event()
+        waited = []
+
+        def load():
+            with cache.loading(1):
+                waited.append(loaded.is_set())
+
+        with cache.loading(1):
+            thread = threading.Thread(target=load)
+            thread.start()
+            thread.join(0.05)
+            self.assertTrue(thread.is_alive())
+            loaded.set()
+        thread.join()
+        self.assertEqual(waited, [True])
+        self.assertEqual(cache.loading_locks, {})
+
+
+if __name__ == '__main__':
+    unittest.main()